@@ -1,23 +1,30 @@
-"""Julynter module"""
+"""Julynter module
+
+The CLI and server extension are imported on demand, so that
+julynter.kernel does not load them into user kernels
+"""
+# pylint: disable=import-outside-toplevel
 import json
 import sys
 from pathlib import Path
 
 from ._version import __version__
 
-if sys.version_info < (3, 5):
-    from .oldcmd import main
-else:
-    from .handlers import setup_handlers
-    from .cmd import main
+HERE = Path(__file__).parent.resolve()
 
-    HERE = Path(__file__).parent.resolve()
 
-    with (HERE / "labextension" / "package.json").open() as fid:
-        data = json.load(fid)
+def main():
+    """Julynter Main CLI"""
+    if sys.version_info < (3, 5):
+        from .oldcmd import main as cmd_main
+    else:
+        from .cmd import main as cmd_main
+    cmd_main()
 
 
 def _jupyter_labextension_paths():
+    with (HERE / "labextension" / "package.json").open() as fid:
+        data = json.load(fid)
     return [{
         "src": "labextension",
         "dest": data["name"]
@@ -38,6 +45,7 @@ def _load_jupyter_server_extension(server_app):
     server_app: jupyterlab.labapp.LabApp
         JupyterLab application instance
     """
+    from .handlers import setup_handlers
     setup_handlers(server_app.web_app)
     server_app.log.info("Registered HelloWorld extension at URL path /jftemp")
 
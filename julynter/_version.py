@@ -1,3 +1,4 @@
+import itertools
 import json
 from pathlib import Path
 
@@ -6,7 +7,10 @@ __all__ = ["__version__"]
 def _fetchVersion():
     HERE = Path(__file__).parent.resolve()
 
-    for settings in HERE.rglob("package.json"): 
+    # The tree is walked only when the labextension is not built
+    for settings in itertools.chain(
+        [HERE / "labextension" / "package.json"], HERE.rglob("package.json")
+    ):
         try:
             with settings.open() as f:
                 version = json.load(f)["version"]
@@ -10,7 +10,8 @@ from ..environments.conda import CondaEnvironment
 from ..environments.venv import VenvEnvironment
 from ..environments.orchestrator import EnvironmentOrchestrator
 from ..environments.imports import create_notebook_with_imports
-from ..cmd.run import simple_view, add_run_arguments
+from ..cmd.run import simple_view, summarize, summary_view, create_store
+from ..cmd.run import add_run_arguments, add_store_arguments
 from ..util import do_exit
 
 
@@ -81,48 +82,14 @@ def display_execution_results(res, args, eargs, exitcode):
     """Display execution results"""
     if args.view_mode == "simple":
         print("Report:")
-    fails = 0
-    skips = 0
-    same = 0
-    same_norm = 0
     for name, nresult in res["notebooks"].items():
         if args.view_mode == "simple":
             print("  {}".format(name))
             simple_view(eargs, nresult, spaces=4)
-        has_error = (
-            not nresult.get("execution", None)
-            or nresult['execution']['status'] == 'error'
-            or 'timeout' in nresult['execution']['processed']
-            or 'exception' in nresult['execution']['processed']
-            or (
-                not eargs.skip_comparison
-                and not 'finished' in nresult.get('diff', {}).get('processed', [])
-            )
-        )
-        if has_error:
-            exitcode = 3
-            fails += 1
-        did_skip = (not has_error and (
-            'not-run' in nresult['execution']['processed']
-            or 'skipped' in nresult['execution']['processed']
-        ))
-        if did_skip:
-            skips += 1
-
-        if not has_error and not did_skip and not eargs.skip_comparison:
-            if nresult["diff"]["diff_count"] == 0:
-                same += 1
-            if nresult["diff"]["diffnorm_count"] == 0:
-                same_norm += 1
-
-    print("\nSummary:")
-    print("  Total: {} notebooks. Skips: {}; Fails: {}".format(
-        len(res['notebooks']), skips, fails
-    ))
-    if not eargs.skip_comparison:
-        print("  Same results before normalizations: {} notebooks".format(same))
-        print("  Same results after normalization: {} notebooks".format(same_norm))
-
+    summary = summarize(res["notebooks"].values(), eargs.skip_comparison)
+    if summary['fails']:
+        exitcode = 3
+    summary_view(summary, eargs.skip_comparison)
     return exitcode
 
 
@@ -153,6 +120,13 @@ def display_results(res, args, eargs):
         exitcode = display_execution_results(res, args, eargs, exitcode)
     return exitcode
 
+def environment_name(args):
+    """Identify the environment in the result store"""
+    if args.env_type == "docker":
+        return "docker:{}".format(args.image_name)
+    return "{}:{}".format(args.env_type, args.envname)
+
+
 async def aenv(args, eargs):
     """run operation"""
     cwd = Path(args.dir)
@@ -163,7 +137,10 @@ async def aenv(args, eargs):
     runner = EnvironmentOrchestrator(
         envi, initial_verbose=args.initial_verbose,
         install_julynter=not args.dont_install_julynter,
-        show_output=args.full_outputs
+        show_output=args.full_outputs,
+        store=create_store(args.store, eargs, environment_name(args)),
+        retry_failures=args.retry_failures,
+        skip_comparison=eargs.skip_comparison,
     )
     install, notebooks, targs, toremove = prepare_files(cwd, args)
     exitcode = 0
@@ -250,6 +227,7 @@ def create_subparsers(subparsers):
         "-w", "--view-mode", type=str, choices=["simple", "summary"], default="simple",
         help="result visualization mode"
     )
+    add_store_arguments(envparser)
 
     parser.add_argument(
         "mode", choices=["run", "prepare", "import", "importtop"],
@@ -1,7 +1,16 @@
 """julynter run command"""
 import json
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
 from .. import util
-from ..runner.runner import Runner
+from ..util import Path, vprint
+from ..runner.runner import Runner, failed_result, result_flags
+from ..runner.pool import KernelPool
+from ..runner.forkserver import ForkServer, DEFAULT_PREIMPORTS
+from ..runner.store import ResultStore
 from ..runner.compare import NORMALIZATIONS, DEFAULT_NORMALIZATION, DEFAULT_SIMILARITY
 
 
@@ -43,32 +52,247 @@ def simple_view(args, runner, spaces=2):
             print("{}    No diff".format(" " * spaces))
 
 
-def run(args, _):
-    """run operation"""
-    util.VERBOSE = args.verbose
-    runner = Runner(
-        args.path, args.cell_order, args.unsafe,
-        args.kernel, args.force_fail, args.timeout,
-        args.show_report,
-        args.normalizations, args.calculate_similarity,
-        args.initial_verbose
-    )
+def summarize(results, skip_comparison):
+    """Count notebook results"""
+    summary = {'total': 0, 'skips': 0, 'fails': 0, 'same': 0, 'same_norm': 0}
+    for nresult in results:
+        summary['total'] += 1
+        has_error, did_skip = result_flags(nresult, skip_comparison)
+        if has_error:
+            summary['fails'] += 1
+        if did_skip:
+            summary['skips'] += 1
+        if not has_error and not did_skip and not skip_comparison:
+            if nresult["diff"]["diff_count"] == 0:
+                summary['same'] += 1
+            if nresult["diff"]["diffnorm_count"] == 0:
+                summary['same_norm'] += 1
+    return summary
+
+
+def summary_view(summary, skip_comparison):
+    """Display summary as prints"""
+    print("\nSummary:")
+    print("  Total: {} notebooks. Skips: {}; Fails: {}".format(
+        summary['total'], summary['skips'], summary['fails']
+    ))
+    if not skip_comparison:
+        print("  Same results before normalizations: {} notebooks".format(summary['same']))
+        print("  Same results after normalization: {} notebooks".format(summary['same_norm']))
+
+
+def find_notebooks(paths):
+    """Expand directories into the notebooks they contain"""
+    notebooks = []
+    for path in paths:
+        path = Path(path).expanduser()
+        if path.is_dir():
+            found = sorted(
+                name for name in path.glob("**/*.ipynb")
+                if '.ipynb_checkpoints' not in name.parts
+            )
+        else:
+            found = [path]
+        for name in found:
+            if str(name) not in notebooks:
+                notebooks.append(str(name))
+    return notebooks
+
+
+def runner_options(args):
+    """Return Runner keyword arguments"""
+    return {
+        'order': args.cell_order,
+        'unsafe': args.unsafe,
+        'kernel': args.kernel,
+        'force_fail': args.force_fail,
+        'notebook_timeout': args.timeout,
+        'show_report': args.show_report,
+        'normalizations': args.normalizations,
+        'calculate_similarity': args.calculate_similarity,
+        'vindex': args.initial_verbose,
+        'incremental_compare': args.incremental_compare and not args.skip_comparison,
+    }
+
+
+# Kernel provider of this process. Worker processes create their own
+KERNEL_PROVIDER = None
+
+
+def provider_options(args):
+    """Return create_provider keyword arguments"""
+    return {
+        'kernel_pool': args.kernel_pool,
+        'fork_server': args.fork_server,
+        'vindex': args.initial_verbose,
+    }
+
+
+def module_list(value):
+    """Parse a comma-separated list of modules"""
+    return [module.strip() for module in value.split(",") if module.strip()]
+
+
+def create_provider(kernel_pool=0, fork_server=None, vindex=3):
+    """Create the kernel provider of run arguments, or None to start a kernel per notebook
+
+    fork_server is the list of modules to pre-import, or None to disable the fork server
+    """
+    if fork_server is not None:
+        return ForkServer(fork_server or DEFAULT_PREIMPORTS, vindex=vindex)
+    if kernel_pool:
+        return KernelPool(size=kernel_pool, vindex=vindex)
+    return None
+
+
+@contextmanager
+def local_provider(options):
+    """Use a kernel provider in this process and close it afterwards"""
+    global KERNEL_PROVIDER  # pylint: disable=global-statement
+    KERNEL_PROVIDER = create_provider(**options)
+    try:
+        yield KERNEL_PROVIDER
+    finally:
+        if KERNEL_PROVIDER is not None:
+            KERNEL_PROVIDER.close()
+        KERNEL_PROVIDER = None
+
+
+def execute(path, options, skip_comparison=False, output=None):
+    """Run and compare a notebook. Return the result dict"""
+    runner = Runner(path, kernel_provider=KERNEL_PROVIDER, **options)
     finished_run = runner.run()
-    if finished_run and not args.skip_comparison:
+    if finished_run and not skip_comparison:
         runner.compare()
-    if args.output:
-        runner.save(args.output)
-    dictresult = {
+    if output:
+        runner.save(output)
+    return {
         'fail': runner.fail,
         'execution': runner.result,
         'diff': runner.diff_result
     }
-    if args.view_mode in ("ejson", "json"):
+
+
+def _format_exception(exc):
+    """Format the traceback of exc and of the exceptions it chains"""
+    return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+
+def _init_worker(verbose, options):
+    """Set the verbose level and create the kernel provider of a worker process"""
+    global KERNEL_PROVIDER  # pylint: disable=global-statement
+    util.VERBOSE = verbose
+    KERNEL_PROVIDER = create_provider(**options)
+    if KERNEL_PROVIDER is not None:
+        # Worker processes do not run atexit handlers, but run multiprocessing finalizers
+        Finalize(None, KERNEL_PROVIDER.close, exitpriority=10)
+
+
+def execute_all(notebooks, options, skip_comparison, jobs, providers=None):
+    """Run notebooks in a pool of jobs processes. Yield (path, result) as they finish
+
+    providers are the create_provider arguments of each process
+    """
+    providers = providers or {}
+    if jobs <= 1:
+        with local_provider(providers):
+            for notebook in notebooks:
+                try:
+                    nresult = execute(notebook, options, skip_comparison)
+                except Exception as exc:  # pylint: disable=broad-except
+                    nresult = failed_result("<Failed to run notebook>", _format_exception(exc))
+                yield notebook, nresult
+        return
+    with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(util.VERBOSE, providers)
+    ) as executor:
+        futures = {
+            executor.submit(execute, notebook, options, skip_comparison): notebook
+            for notebook in notebooks
+        }
+        for future in as_completed(futures):
+            try:
+                nresult = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                # The exception of a worker process chains its remote traceback
+                nresult = failed_result("<Failed to run notebook>", _format_exception(exc))
+            yield futures[future], nresult
+
+
+def view(args, notebook, dictresult, many):
+    """Display the result of a notebook"""
+    if args.view_mode == "jsonl":
+        print(json.dumps(dict(notebook=notebook, **dictresult)))
+    elif args.view_mode in ("ejson", "json"):
         if args.view_mode == "ejson":
             print("<<<<---julyntersep--->>>>")
         json_view(dictresult)
     elif args.view_mode == "simple":
+        if many:
+            print(notebook)
         simple_view(args, dictresult)
+    sys.stdout.flush()
+
+
+def create_store(path, args, environment):
+    """Create the ResultStore of run arguments, or None if path is not set"""
+    if not path:
+        return None
+    return ResultStore(
+        path, args.cell_order, [] if args.skip_comparison else args.normalizations,
+        environment
+    )
+
+
+def store_result(store, key, dictresult, skip_comparison):
+    """Store the result of a notebook"""
+    if store is not None:
+        has_error, _ = result_flags(dictresult, skip_comparison)
+        store.put(key, has_error, dictresult)
+
+
+def run(args, _):
+    """run operation"""
+    util.VERBOSE = args.verbose
+    notebooks = find_notebooks(args.paths)
+    many = len(notebooks) != 1
+    if args.output and many:
+        args.command.error("--output requires a single notebook")
+    if args.kernel_pool and args.fork_server is not None:
+        args.command.error("--kernel-pool and --fork-server are mutually exclusive")
+    options = runner_options(args)
+    store = create_store(args.store, args, "local:{}".format(args.kernel or ""))
+    keys = {}
+    results = []
+    pending = []
+    for notebook in notebooks:
+        if store is not None and not args.output:
+            keys[notebook] = store.key(notebook)
+            dictresult = store.completed(keys[notebook], args.retry_failures)
+            if dictresult is not None:
+                vprint(args.initial_verbose, "Using stored result of {}".format(notebook))
+                results.append(dictresult)
+                view(args, notebook, dictresult, many)
+                continue
+        pending.append(notebook)
+    if not many:
+        with local_provider(provider_options(args)):
+            for notebook in pending:
+                dictresult = execute(notebook, options, args.skip_comparison, args.output)
+                store_result(store, keys.get(notebook), dictresult, args.skip_comparison)
+                view(args, notebook, dictresult, many)
+        return
+    for notebook, dictresult in execute_all(
+            pending, options, args.skip_comparison, args.jobs, provider_options(args)
+    ):
+        store_result(store, keys.get(notebook), dictresult, args.skip_comparison)
+        results.append(dictresult)
+        view(args, notebook, dictresult, many)
+    summary = summarize(results, args.skip_comparison)
+    if args.view_mode == "jsonl":
+        print(json.dumps({'summary': summary}))
+    else:
+        summary_view(summary, args.skip_comparison)
 
 
 def create_subparsers(subparsers):
@@ -79,8 +303,22 @@ def create_subparsers(subparsers):
     runparser.set_defaults(func=run, command=runparser)
     add_run_arguments(runparser)
     runparser.add_argument(
-        "path", type=str,
-        help="notebook path")
+        "paths", type=str, nargs="+",
+        help="notebook paths or directories with notebooks")
+    add_store_arguments(runparser)
+
+
+def add_store_arguments(parser):
+    """Add result store arguments to parsers"""
+    parser.add_argument(
+        "--store", type=str,
+        help="SQLite result store. Notebooks with stored results are not executed again"
+    )
+    parser.add_argument(
+        "--retry-failures", action="store_true",
+        help="execute notebooks with stored failures again"
+    )
+
 
 def add_run_arguments(runparser):
     """Add run arguments to parsers"""
@@ -136,13 +374,40 @@ def add_run_arguments(runparser):
         "-x", "--skip-comparison", action="store_true",
         help="do not compare results after execution"
     )
+    runparser.add_argument(
+        "-e", "--incremental-compare", action="store_true",
+        help="compare each cell while the next cell executes"
+    )
     runparser.add_argument(
         "-i", "--initial-verbose", type=int, default=1,
         help="initial verbose level"
     )
     runparser.add_argument(
-        "-w", "--view-mode", type=str, choices=["ejson", "json", "simple"], default="simple",
-        help="result visualization mode"
+        "-w", "--view-mode", type=str, choices=["ejson", "json", "jsonl", "simple"],
+        default="simple",
+        help="result visualization mode. 'jsonl' prints one line per notebook and a summary"
+    )
+    runparser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of worker processes for running many notebooks"
+    )
+    runparser.add_argument(
+        "-p", "--kernel-pool", type=int, default=0,
+        help="keep this number of started kernels per worker process for Python notebooks"
+    )
+    runparser.add_argument(
+        "-F", "--fork-server", type=module_list, metavar="MODULES",
+        help=(
+            "fork Python kernels from a process that pre-imported these "
+            "comma-separated modules"
+        )
+    )
+    runparser.add_argument(
+        "--fork-server-defaults", action="store_const", dest="fork_server",
+        const=list(DEFAULT_PREIMPORTS),
+        help="fork Python kernels with the default pre-imports ({})".format(
+            ",".join(DEFAULT_PREIMPORTS)
+        )
     )
     runparser.add_argument(
         "-m", "--hide-message", action="store_true",
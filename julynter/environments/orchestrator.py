@@ -2,7 +2,7 @@
 import json
 from .. import util
 from ..util import vprint
-from ..runner.runner import clean_diff_result, clean_result, clean_fail
+from ..runner.runner import failed_result, result_flags
 from .process import printout, printerr
 from .base import Environment
 
@@ -13,7 +13,8 @@ class EnvironmentOrchestrator:
             self, environment: Environment,
             dryrun_install=False, dryrun_execute=False,
             install_julynter=True, show_output=False,
-            initial_verbose=0,
+            initial_verbose=0, store=None, retry_failures=False,
+            skip_comparison=False,
         ):
         # pylint: disable=too-many-arguments
         self.environment: Environment = environment
@@ -22,6 +23,9 @@ class EnvironmentOrchestrator:
         self.should_install_julynter = install_julynter
         self.iverbose = initial_verbose
         self.show_output = show_output
+        self.store = store
+        self.retry_failures = retry_failures
+        self.skip_comparison = skip_comparison
 
         self.install_map = {
             "setup.py": self.install_setups,
@@ -225,6 +229,14 @@ class EnvironmentOrchestrator:
         for notebook in notebooks:
             if self.should_exit():
                 return result
+            key = None
+            if self.store is not None:
+                key = self.store.key(ocwd / notebook)
+                stored = self.store.completed(key, self.retry_failures)
+                if stored is not None:
+                    self.rprint(self.iverbose, "Using stored result of {}".format(notebook))
+                    result["notebooks"][notebook] = stored
+                    continue
             self.rprint(self.iverbose, "Running notebook {}".format(notebook))
             presult = await self.run(
                 "julynter run '{}' -w ejson {}".format(
@@ -236,16 +248,13 @@ class EnvironmentOrchestrator:
             if sep in presult.stdout:
                 result["notebooks"][notebook] = json.loads(presult.stdout.split(sep)[-1])
             else:
-                nresult = {
-                    "execution": clean_result(),
-                    "fail": clean_fail(),
-                    "diff": clean_diff_result(),
-                }
-                nresult["execution"]["status"] = "error"
-                if presult.returncode != 0:
-                    nresult["fail"]["reason"] = "<Failed to run notebook>"
-                else:
-                    nresult["fail"]["reason"] = "<Failed to parse results>"
-                nresult["fail"]["msg"] = self._output_data(presult)
-                result["notebooks"][notebook] = nresult
+                result["notebooks"][notebook] = failed_result(
+                    "<Failed to run notebook>" if presult.returncode != 0
+                    else "<Failed to parse results>",
+                    self._output_data(presult)
+                )
+            if self.store is not None:
+                nresult = result["notebooks"][notebook]
+                has_error, _ = result_flags(nresult, self.skip_comparison)
+                self.store.put(key, has_error, nresult)
         return result
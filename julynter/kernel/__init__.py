@@ -3,10 +3,12 @@ from .linter import JulynterKernel
 
 COMM = None
 
-def init():
-    """Init julynter"""
+def init(**kwargs):
+    """Init julynter. Keyword arguments are passed to JulynterKernel"""
     # pylint: disable=undefined-variable, global-statement
     global COMM
-    COMM = JulynterKernel(get_ipython())
+    if COMM is not None:
+        COMM.close()
+    COMM = JulynterKernel(get_ipython(), **kwargs)
     COMM.register()
     
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""Benchmarks of the kernel extension
+
+Run as ``python -m julynter.kernel.benchmark [budget]`` to check that
+``import julynter.kernel`` stays within budget milliseconds and does not
+load the server and CLI stack into user kernels. It exits with status 1
+when the check fails.
+
+Run as ``python -m julynter.kernel.benchmark namespace [budget] [iterations]``
+to check that namespace tracking adds at most budget nanoseconds to each
+namespace access of a numeric loop. It exits with status 1 when the check fails
+"""
+import json
+import subprocess
+import sys
+import time
+
+DEFAULT_IMPORT_BUDGET = 100  # milliseconds
+IMPORT_RUNS = 3
+
+# Modules that a running kernel already loaded before the extension
+BASELINE_MODULES = ('IPython', 'ipykernel.comm')
+FORBIDDEN_MODULES = ('jupyter_server', 'tornado', 'nbconvert', 'jupyterlab')
+
+# Module-level loop: each iteration reads total, abs (a builtin), index and
+# scale, and writes index and total through the namespace
+LOOP_CODE = '''
+total = 0
+for index in range(n):
+    total += abs(index) * scale
+'''
+LOOP_ACCESSES = 6
+NAMESPACE_ITERATIONS = 1000000
+DEFAULT_NAMESPACE_BUDGET = 150  # nanoseconds per namespace access
+
+IMPORT_CODE = '''
+import importlib, json, sys, time
+for module in {baseline!r}:
+    importlib.import_module(module)
+before = set(sys.modules)
+start = time.perf_counter()
+import julynter.kernel
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"time": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+'''
+
+
+def measure_import():
+    """Import julynter.kernel in a fresh interpreter. Return (ms, loaded modules)"""
+    process = subprocess.run(
+        [sys.executable, '-c', IMPORT_CODE.format(baseline=BASELINE_MODULES)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return result['time'], result['modules']
+
+
+def check_import(budget=DEFAULT_IMPORT_BUDGET, runs=IMPORT_RUNS):
+    """Return the list of failures of the import check"""
+    times = []
+    modules = []
+    for _ in range(runs):
+        elapsed, modules = measure_import()
+        times.append(elapsed)
+    elapsed = min(times)
+    print("import julynter.kernel: {:.1f} ms (budget {} ms), {} new modules".format(
+        elapsed, budget, len(modules)
+    ))
+    failures = []
+    if elapsed > budget:
+        failures.append("import took {:.1f} ms".format(elapsed))
+    forbidden = [
+        module for module in modules
+        if module.split('.')[0] in FORBIDDEN_MODULES
+    ]
+    if forbidden:
+        failures.append("import loaded {}".format(", ".join(forbidden)))
+    return failures
+
+
+def measure_namespace(iterations=NAMESPACE_ITERATIONS, repeat=5):
+    """Return the best times in seconds of LOOP_CODE in a dict and in a tracking namespace"""
+    # pylint: disable=import-outside-toplevel, exec-used
+    from .namespace import JulynterTrackingNamespace
+    code = compile(LOOP_CODE, '<benchmark>', 'exec')
+    times = []
+    for namespace_type in (dict, JulynterTrackingNamespace):
+        best = None
+        for _ in range(repeat):
+            namespace = namespace_type(n=iterations, scale=2)
+            start = time.perf_counter()
+            exec(code, namespace, namespace)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+    return times
+
+
+def namespace_main(budget=DEFAULT_NAMESPACE_BUDGET, iterations=NAMESPACE_ITERATIONS):
+    """Check the per-access overhead of namespace tracking and return the exit status"""
+    budget = float(budget)
+    iterations = int(iterations)
+    plain, tracking = measure_namespace(iterations)
+    overhead = (tracking - plain) * 1e9 / (iterations * LOOP_ACCESSES)
+    print("plain dict: {:.1f} ms, tracking namespace: {:.1f} ms".format(
+        plain * 1000, tracking * 1000
+    ))
+    print("overhead: {:.1f} ns per namespace access ({:.2f}x, budget {} ns)".format(
+        overhead, tracking / plain, budget
+    ))
+    if overhead > budget:
+        print("FAIL: namespace tracking added {:.1f} ns per access".format(overhead))
+        return 1
+    return 0
+
+
+def main(*args):
+    """Run the benchmark selected by args and return the exit status"""
+    if args and args[0] == 'namespace':
+        return namespace_main(*args[1:])
+    return import_main(*args)
+
+
+def import_main(budget=DEFAULT_IMPORT_BUDGET):
+    """Run the import checks and return the exit status"""
+    try:
+        failures = check_import(float(budget))
+    except RuntimeError as exc:
+        failures = ["import failed:\n{}".format(exc)]
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*sys.argv[1:]))
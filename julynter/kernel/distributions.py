@@ -0,0 +1,105 @@
+"""Map top-level module names to installed distributions"""
+import os
+import sys
+
+MODULE_SUFFIXES = ('.py', '.pyc', '.so', '.pyd')
+IGNORED_SUFFIXES = ('.dist-info', '.egg-info', '.data')
+
+
+def _top_level_names(dist):
+    """Return top-level module names provided by distribution"""
+    text = dist.read_text('top_level.txt')
+    if text:
+        return {name.strip().replace('/', '.').split('.')[0] for name in text.split()}
+    names = set()
+    for path in dist.files or []:
+        parts = path.parts
+        if not parts or parts[0].startswith('..'):
+            continue
+        first = parts[0]
+        if len(parts) > 1:
+            if first == '__pycache__' or first.endswith(IGNORED_SUFFIXES):
+                continue
+            names.add(first)
+        elif first.endswith(MODULE_SUFFIXES):
+            names.add(first.split('.')[0])
+    return {name for name in names if name.isidentifier()}
+
+
+class JulynterDistributions(object):
+    """Lazy index of top-level module names to (distribution, version) lists
+
+    The index is built on the first lookup and rebuilt only when the
+    sys.path entries change or a directory that holds distribution metadata
+    changes (e.g., after a pip install). The working directory is never
+    checked, since notebooks write files there all the time
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self):
+        self.key = None
+        self.site_dirs = ()
+        self.modules = {}
+        self.versions = {}
+
+    def _path_key(self):
+        """Return sys.path entries with the mtimes of the metadata directories"""
+        mtimes = []
+        for directory in self.site_dirs:
+            try:
+                mtimes.append(os.stat(directory).st_mtime_ns)
+            except (OSError, ValueError):
+                mtimes.append(None)
+        return (tuple(sys.path), tuple(mtimes))
+
+    @staticmethod
+    def _site_dir(dist, cwd):
+        """Return the directory that holds the metadata of dist, unless it is cwd"""
+        try:
+            directory = os.path.realpath(str(dist.locate_file('')))
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if directory == cwd or not os.path.isdir(directory):
+            return None
+        return directory
+
+    def refresh(self):
+        """Rebuild the index if sys.path changed"""
+        # pylint: disable=import-outside-toplevel
+        key = self._path_key()
+        if key == self.key:
+            return
+        try:
+            from importlib import metadata
+        except ImportError:  # Python < 3.8
+            import importlib_metadata as metadata  # pylint: disable=import-error
+        modules = {}
+        versions = {}
+        site_dirs = set()
+        cwd = os.path.realpath(os.getcwd())
+        for dist in metadata.distributions():
+            directory = self._site_dir(dist, cwd)
+            if directory is not None:
+                site_dirs.add(directory)
+            name = dist.metadata['Name']
+            if not name or name in versions:
+                continue
+            versions[name] = dist.version
+            for module in _top_level_names(dist):
+                modules.setdefault(module, []).append(name)
+        self.modules = modules
+        self.versions = versions
+        self.site_dirs = tuple(sorted(site_dirs))
+        self.key = self._path_key()
+
+    def packages(self, module_name):
+        """Return the distributions that provide top-level module_name"""
+        if self.key is None:
+            self.refresh()
+        return self.modules.get(module_name.split('.')[0], [])
+
+    def version(self, package):
+        """Return the installed version of distribution package or None"""
+        if self.key is None:
+            self.refresh()
+        return self.versions.get(package)
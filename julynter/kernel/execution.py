@@ -0,0 +1,72 @@
+"""Measure the cost of cell executions"""
+import os
+import time
+
+STATM_PATH = '/proc/self/statm'
+
+
+def _statm_rss():
+    """Read the resident set size in bytes from /proc"""
+    with open(STATM_PATH, 'rb') as fil:
+        return int(fil.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def rss_reader():
+    """Return a function that reads the resident set size in bytes, or None"""
+    # pylint: disable=import-outside-toplevel
+    if os.path.exists(STATM_PATH):
+        return _statm_rss
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = psutil.Process()
+    return lambda: process.memory_info().rss
+
+
+class JulynterExecutionMeter(object):
+    """Measure wall time, CPU time and resident memory change of an execution
+
+    The measures span from pre_run_cell to post_run_cell, so they include the
+    input transformation and the history storage of IPython.
+    CPU time is the process time, so it includes threads started by the cell.
+    The resident set size is only read at the end of executions (reading it
+    releases the GIL, which lets IPython's history thread delay the cell), so
+    the memory change is measured from the end of the previous execution
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, read_rss=None):
+        self.read_rss = read_rss if read_rss is not None else rss_reader()
+        self.started = None
+        self.last_rss = self._rss()
+
+    def _rss(self):
+        """Return the resident set size in bytes or None"""
+        if self.read_rss is None:
+            return None
+        try:
+            return self.read_rss()
+        except (OSError, ValueError):
+            return None
+
+    def start(self):
+        """Start measuring"""
+        self.started = (self.last_rss, time.process_time(), time.perf_counter())
+
+    def stop(self):
+        """Return {"wall": ms, "cpu": ms, "rss": bytes} or None if it did not start"""
+        if self.started is None:
+            return None
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        rss, (start_rss, start_cpu, start_wall) = self._rss(), self.started
+        self.started = None
+        self.last_rss = rss
+        result = {
+            'wall': (wall - start_wall) * 1000,
+            'cpu': (cpu - start_cpu) * 1000,
+        }
+        if rss is not None and start_rss is not None:
+            result['rss'] = rss - start_rss
+        return result
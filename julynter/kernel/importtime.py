@@ -0,0 +1,103 @@
+"""Measure the time of imports while cells run"""
+import builtins
+import sys
+import threading
+import time
+
+
+def _called_from(namespace):
+    """Check if code of namespace is on the call stack of an import hook"""
+    if namespace is None:
+        return True
+    frame = sys._getframe(2)  # pylint: disable=protected-access
+    while frame is not None:
+        if frame.f_globals is namespace:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class JulynterImportProfiler(object):
+    """Measure cumulative and self time of top-level modules imported by a cell
+
+    The profiler replaces builtins.__import__ while it is active.
+    Imports of loaded modules and imports of other threads go straight to the
+    original function. When a namespace is given, only imports that run
+    while code of the namespace is on the call stack are measured, so imports
+    of the shell itself (e.g., while it formats a traceback) are not charged
+    to the cell. importlib.import_module does not call __import__, so only
+    the imports that run inside the modules it loads are measured.
+    The self time of a module excludes the time of nested imports of other
+    top-level modules
+    """
+    # pylint: disable=useless-object-inheritance, too-many-instance-attributes
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.original = builtins.__import__
+        self.installed = False
+        self.hook = self._import
+        self.thread = None
+        self.namespace = None
+        self.stack = []
+        self.times = {}
+
+    def start(self, namespace=None):
+        """Start measuring imports of the current thread called by code of namespace"""
+        if not self.installed:
+            self.original = builtins.__import__
+            builtins.__import__ = self.hook
+            self.installed = True
+        self.thread = threading.get_ident()
+        self.namespace = namespace
+        self.stack = []
+        self.times = {}
+
+    def stop(self):
+        """Stop measuring and return {module: {"cumulative": ms, "self": ms}}"""
+        self.thread = None
+        self.namespace = None
+        if self.installed and builtins.__import__ is self.hook:
+            # Keep the hook if another tool replaced __import__ after it
+            builtins.__import__ = self.original
+            self.installed = False
+        times, self.times = self.times, {}
+        return {
+            module: {'cumulative': values[0] * 1000, 'self': values[1] * 1000}
+            for module, values in times.items()
+        }
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Replacement of builtins.__import__"""
+        # pylint: disable=redefined-builtin, too-many-arguments
+        original = self.original
+        if (
+                self.thread is None
+                or (level == 0 and name in sys.modules)
+                or self.thread != threading.get_ident()
+        ):
+            return original(name, globals, locals, fromlist, level)
+        if level:
+            # Relative imports stay in the package of the importer
+            top = ((globals or {}).get('__package__') or '').split('.')[0]
+        else:
+            top = name.split('.')[0]
+        stack = self.stack
+        if not top or (stack and stack[-1][0] == top) or (
+                not stack and not _called_from(self.namespace)
+        ):
+            return original(name, globals, locals, fromlist, level)
+        frame = [top, 0.0]
+        stack.append(frame)
+        start = self.clock()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = self.clock() - start
+            stack.pop()
+            values = self.times.setdefault(top, [0.0, 0.0])
+            if all(other[0] != top for other in stack):
+                values[0] += elapsed
+            values[1] += elapsed - frame[1]
+            if stack:
+                stack[-1][1] += elapsed
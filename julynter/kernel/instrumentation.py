@@ -0,0 +1,93 @@
+"""Measure the time and the work of query phases"""
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_STATS_WINDOW = 200
+PERCENTILES = (50, 90, 99)
+
+
+class JulynterTimings(object):
+    """Wall time and counter deltas of the phases of a single query"""
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, counters):
+        self.counters = counters
+        self.start = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Measure phase"""
+        before = dict(self.counters)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            result = {'time': (time.perf_counter() - start) * 1000}
+            for key, value in self.counters.items():
+                delta = value - before.get(key, 0)
+                if delta:
+                    result[key] = delta
+            self.phases[name] = result
+
+    def result(self):
+        """Return timings block in milliseconds"""
+        return {
+            'total': (time.perf_counter() - self.start) * 1000,
+            'phases': self.phases,
+        }
+
+
+class JulynterStats(object):
+    """Rolling window of phase times"""
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, window=DEFAULT_STATS_WINDOW):
+        self.window = window
+        self.samples = {}
+
+    def add(self, timings):
+        """Add the result of a JulynterTimings"""
+        self._add('total', timings['total'])
+        for name, values in timings['phases'].items():
+            self._add(name, values['time'])
+
+    def _add(self, name, value):
+        """Add sample"""
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+        self.samples[name].append(value)
+
+    def result(self):
+        """Return count, percentiles and max of each phase"""
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            summary = {'count': len(ordered), 'max': ordered[-1]}
+            for percentile in PERCENTILES:
+                index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+                summary['p{}'.format(percentile)] = ordered[index]
+            result[name] = summary
+        return result
+
+
+class _NullPhase(object):
+    """Reusable phase context of disabled instrumentation"""
+    # pylint: disable=useless-object-inheritance, too-few-public-methods
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_PHASE = _NullPhase()
+
+
+def phase(timings, name):
+    """Return a context that measures phase name if timings is enabled"""
+    if timings is None:
+        return NULL_PHASE
+    return timings.phase(name)
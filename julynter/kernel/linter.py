@@ -1,69 +1,103 @@
 """Define main julynter checks"""
-import ast
-import os
 import sys
-import re
 import builtins
+import threading
+import time
 import traceback
-from collections import defaultdict
-from copy import copy
-import pkg_resources
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from copy import copy, deepcopy
 
-from .ast_visitors import JulynterImportVisitor, JulynterNameVisitor, JulynterPathVisitor
+from .symbols import JulynterCellSymbols
+from .distributions import JulynterDistributions
+from .execution import JulynterExecutionMeter
+from .importtime import JulynterImportProfiler
+from .instrumentation import JulynterStats, JulynterTimings, phase
 from .jcomm import JulynterComm
+from .memory import julynter_memory, DEFAULT_MEMORY_BUDGET, DEFAULT_MEMORY_TOP
+from .namespace import install_tracking_namespace
+from .records import JulynterCellRecord
+from .scanner import JulynterCellScanner
+from .paths import JulynterPathProbe, DEFAULT_PATH_TTL
+from .requirements import JulynterRequirements
+from .store import JulynterRecordStore, DEFAULT_ANALYSIS_CACHE, source_digest
+from .versioning import JulynterResultVersions
+from .worker import JulynterWorker
 
+DEFAULT_MAX_CACHED_SOURCES = 1000
+MAX_SOURCE_RECORDS = 10000
 
-def _julynter_get_package(module_name):
+
+def _julynter_get_package(module_name, distributions, requirements=None):
     if module_name not in sys.modules:
         return (2, 'Module {} not imported'.format(module_name))
     module = sys.modules[module_name]
     if not hasattr(module, '__file__'):
         return (0, 'Builtin module')
-    package_matches = re.findall('site-packages/(.*?)/', module.__file__)
-    if not package_matches:
+    packages = distributions.packages(module_name)
+    if not packages:
         return (1, 'Package not found')
-    return (-1, package_matches[0])
+    if requirements is not None:
+        # Namespace packages may be provided by many distributions
+        for package in packages:
+            if requirements.get(package) is not None:
+                return (-1, package)
+    return (-1, packages[0])
 
 
-def _julynter_check_package_version(module_name, requirements):
-    status, msg = _julynter_get_package(module_name)
+def _julynter_check_package_version(module_name, distributions, requirements):
+    status, msg = _julynter_get_package(module_name, distributions, requirements)
     if status != -1:
         return (status, msg)
     package = msg
-    found = None
-    if not os.path.exists(requirements):
+    if requirements.key is None:
         return (3, "requirements.txt doesn't exist")
-    with open(requirements, 'r') as fil:
-        for line in fil:
-            if line.strip().startswith(package):
-                found = line
-                break
+    found = requirements.get(package)
     if found is None:
         return (3, 'Module not found on requirements.txt')
-    try:
-        distribution = pkg_resources.get_distribution(package)
-    except pkg_resources.DistributionNotFound:
+    version = distributions.version(package)
+    if version is None:
         return (1, 'Distribution not found')
-    version = distribution.version
     req_version = found.strip().split('==')[-1]
     if version != req_version:
         return (3, 'Version mismatch')
     return (0, 'Ok')
 
 
+def _select(values, scope):
+    """Copy entries of values with keys in scope"""
+    return {
+        lineno: deepcopy(values[lineno])
+        for lineno in scope if lineno in values
+    }
+
+
 class JulynterKernel(JulynterComm):
     """Implements julynter checks"""
+    # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+            self, *args, path_ttl=DEFAULT_PATH_TTL, eager=True,
+            max_cached_sources=DEFAULT_MAX_CACHED_SOURCES,
+            analysis_cache=DEFAULT_ANALYSIS_CACHE, instrument=False,
+            profile_imports=True, measure_executions=False, track_namespace=False, **kwargs
+    ):
+        # pylint: disable=too-many-arguments
         super(JulynterKernel, self).__init__(*args, **kwargs)
+        self.eager = eager
+        self.lock = threading.RLock()
+        self.query_lock = threading.Lock()
+        self.pending_query = None
+        self.push = False
+        self.pushed = (None, None)
+        self.worker = JulynterWorker(self._work)
         self.history = self.shell.history_manager
         self.cache = {
             'lineno_order': [],
-            'python_trees': {},
+            'cell_records': {},
+            'source_records': {},
             'processed': set(),
-            'name_definitions': {},
-            'import_definitions': {},
-            'name_usages': {},
+            'definition_index': defaultdict(list),
             'cell_dependencies': defaultdict(dict),
             'missing_dependencies': {},
 
@@ -72,74 +106,461 @@ class JulynterKernel(JulynterComm):
             'missing_requirements': defaultdict(dict),
             'requirements_processed': set(),
             'has_imports': [],
+            'import_times': {},
+            'execution_costs': {},
+            'runtime_accesses': {},
+        }
+        self.versions = JulynterResultVersions(
+            limits={'executed_code': max_cached_sources},
+            loader=self._load_history_entry,
+        )
+        self.instrument = instrument
+        self.counters = dict.fromkeys((
+            'history_entries', 'cells_parsed', 'record_cache_hits', 'store_hits',
+            'cells_resolved', 'usages_resolved', 'imports_checked', 'paths_checked',
+        ), 0)
+        self.stats = JulynterStats()
+        self.path_probe = JulynterPathProbe(ttl=path_ttl, counters=self.counters)
+        self.requirements = JulynterRequirements()
+        self.distributions = JulynterDistributions()
+        self.store = JulynterRecordStore(analysis_cache)
+        self.import_profiler = JulynterImportProfiler() if profile_imports else None
+        self.execution_meter = JulynterExecutionMeter() if measure_executions else None
+        self.track_namespace = track_namespace
+        self.namespace = None
+        self.running_lineno = None
+        # Measures of executions, stored by the thread that holds the lock
+        self.measures = deque()
+
+    def register(self):
+        """Register comm, start the worker and register the run_cell hooks"""
+        super(JulynterKernel, self).register()
+        self.worker.start()
+        if self.track_namespace:
+            self.namespace = install_tracking_namespace(self.shell)
+        self.shell.events.register('pre_run_cell', self._pre_run_cell)
+        self.shell.events.register('post_run_cell', self._post_run_cell)
+
+    def close(self):
+        """Unregister the run_cell hooks and stop the worker"""
+        self.shell.events.unregister('pre_run_cell', self._pre_run_cell)
+        self.shell.events.unregister('post_run_cell', self._post_run_cell)
+        if self.import_profiler is not None:
+            self.import_profiler.stop()
+        self.worker.stop()
+
+    def _pre_run_cell(self, info=None):
+        """Start measuring the imports and the cost of the cell"""
+        if info is not None and not getattr(info, 'store_history', True):
+            # The execution does not create a history entry
+            self.running_lineno = None
+            return
+        self.running_lineno = self.shell.execution_count
+        if self.namespace is not None:
+            self.namespace.collect()
+        if self.import_profiler is not None:
+            self.import_profiler.start(self.shell.user_ns)
+        if self.execution_meter is not None:
+            self.execution_meter.start()
+
+    def _post_run_cell(self, *_args):
+        """Queue the measures of the cell and the new history entry for analysis
+
+        The hook never waits for the analysis lock, so a slow analysis in the
+        worker does not delay the next cell
+        """
+        lineno, self.running_lineno = self.running_lineno, None
+        if lineno is not None:
+            cost = None
+            if self.execution_meter is not None:
+                cost = self.execution_meter.stop()
+            import_times = None
+            if self.import_profiler is not None:
+                import_times = self.import_profiler.stop()
+            accesses = None
+            if self.namespace is not None:
+                accesses = self.namespace.collect(self.shell.user_ns_hidden)
+            if cost is not None or import_times or accesses is not None:
+                self.measures.append((lineno, cost, import_times, accesses))
+        if self.eager:
+            self.worker.schedule()
+
+    def _store_measures(self):
+        """Store the queued measures of executions. Requires the lock"""
+        while self.measures:
+            lineno, cost, import_times, accesses = self.measures.popleft()
+            if accesses is not None:
+                self._store_runtime_accesses(lineno, accesses)
+            if cost is not None:
+                self.cache['execution_costs'][lineno] = cost
+            if import_times:
+                self.cache['import_times'][lineno] = import_times
+
+    def _store_runtime_accesses(self, lineno, accesses):
+        """Store the (reads, writes) of an execution to resolve its dependencies"""
+        self.cache['runtime_accesses'][lineno] = accesses
+        if lineno in self.cache['processed']:
+            # The worker analyzed the history entry while it was running
+            self.cache['processed'].discard(lineno)
+            self.cache['cell_dependencies'].pop(lineno, None)
+
+    def analyze(self):
+        """Parse and analyze the history entries that were not analyzed yet"""
+        with self.lock:
+            self._parse_cell_trees()
+            self._julynter_dependencies()
+            if self.cache['last_requirements']:
+                self._julynter_imports(self.cache['last_requirements'])
+
+    def _work(self):
+        """Answer the latest pending query or analyze new history entries"""
+        with self.lock:
+            self._store_measures()
+        with self.query_lock:
+            data, self.pending_query = self.pending_query, None
+        if data is not None:
+            self.reply(data)
+        elif self.push:
+            self.push_update()
+        else:
+            self.analyze()
+
+    def push_update(self):
+        """Send an update with the entries that changed since the last push or query"""
+        epoch, since = self.pushed
+        result = self.julynter_query(
+            self.cache['last_requirements'] or 'requirements.txt',
+            versioned=True, since=since, epoch=epoch
+        )
+        if not result['full'] and result['version'] == since:
+            return
+        self.pushed = (result['epoch'], result['version'])
+        update = {
+            key: value for key, value in result.items()
+            if value or not isinstance(value, (dict, list))
         }
+        update['operation'] = 'update'
+        update['since'] = since
+        self.send(update)
 
     def receive(self, msg):
         data = msg['content']['data']
+        if data.get('operation') == 'query' and self.worker.thread is not None:
+            # Queries that are still pending are superseded by the new one
+            with self.query_lock:
+                self.pending_query = data
+            self.worker.schedule()
+        else:
+            self.reply(data)
+
+    def reply(self, data):
+        """Process operation and send the reply with the request id"""
+        # pylint: disable=too-many-branches
         operation = data.get('operation', '<undefined>')
+        result = None
         try:
             if operation == 'query':
                 req = data.get('requirements', 'requirements.txt')
-                self.send(self.julynter_query(req))
+                scope = self._scope_arg(data)
+                if 'push' in data:
+                    # Push mode requires the post_run_cell hook of eager analysis
+                    self.push = bool(data['push']) and self.eager
+                if scope is not None:
+                    result = self.julynter_scoped_query(
+                        req, scope, timings=bool(data.get('timings'))
+                    )
+                else:
+                    result = self.julynter_query(
+                        req, timings=bool(data.get('timings')), **self._version_args(data)
+                    )
+                    if 'full' in result:
+                        self.pushed = (result['epoch'], result['version'])
+                result['push'] = self.push
+            elif operation == 'stats':
+                result = {
+                    'operation': 'statsResult',
+                    'phases': self.stats.result(),
+                    'counters': dict(self.counters),
+                }
+            elif operation == 'analyze':
+                result = self.julynter_analyze(data.get('cells', []))
+            elif operation == 'memory':
+                result = self.julynter_memory(
+                    int(data.get('top') or DEFAULT_MEMORY_TOP),
+                    float(data.get('budget') or DEFAULT_MEMORY_BUDGET),
+                )
             elif operation == 'addModule':
                 req = data.get('requirements', 'requirements.txt')
                 module = data.get('module', '<undefined>')
-                result = self.add_package_to_requirements(module, req)
-                if result[0] <= 0:
-                    self.send(self.julynter_query(req))
+                status = self.add_package_to_requirements(module, req)
+                if status[0] <= 0:
+                    result = self.julynter_query(req, **self._version_args(data))
                 else:
-                    self.send({
+                    result = {
                         'operation': 'error',
                         'command': operation,
-                        'message': result[1],
-                        'errorid': result[0],
-                    })
+                        'message': status[1],
+                        'errorid': status[0],
+                    }
         except Exception:  # pylint: disable=broad-except
-            self.send({
+            result = {
                 'operation': 'error',
                 'command': operation,
                 'message': traceback.format_exc()
-            })
-
-    def julynter_query(self, requirements_file='requirements.txt'):
-        """Extract info from history"""
-        self._parse_cell_trees()
-        cell_dependencies, missing_dependencies = self._julynter_dependencies()
-        has_imports, missing_requirements = self._julynter_imports(requirements_file)
-        result = {
-            'operation': 'queryResult',
-            'executed_code': self._julynter_history(),
-            'cell_dependencies': cell_dependencies,
-            'missing_dependencies': missing_dependencies,
-            'absolute_paths': self._julynter_absolute_paths(),
-            'has_imports': has_imports,
-            'missing_requirements': missing_requirements,
+            }
+        if result is not None:
+            if 'requestId' in data:
+                result['requestId'] = data['requestId']
+            self.send(result)
+
+    @staticmethod
+    def _version_args(data):
+        """Extract the result version known by the client"""
+        if 'version' not in data:
+            return {}
+        return {
+            'versioned': True,
+            'since': data.get('version'),
+            'epoch': data.get('epoch'),
         }
+
+    @staticmethod
+    def _scope_arg(data):
+        """Extract the requested cells or [start, stop) range of history line numbers"""
+        if data.get('cells') is not None:
+            return {int(lineno) for lineno in data['cells']}
+        if data.get('start') is not None or data.get('stop') is not None:
+            return range(int(data.get('start') or 1), int(data.get('stop') or sys.maxsize))
+        return None
+
+    def julynter_scoped_query(self, requirements_file, scope, timings=False):
+        """Extract info from history for the line numbers in scope
+
+        The analysis of new entries is global, so dependencies stay consistent,
+        but only entries in scope are assembled and probed.
+        Scoped results are never deltas and do not change the result version
+        """
+        timings = JulynterTimings(self.counters) if timings or self.instrument else None
+        with self.lock:
+            with phase(timings, 'parse'):
+                self._parse_cell_trees()
+            with phase(timings, 'dependencies'):
+                cell_dependencies, missing_dependencies = self._julynter_dependencies()
+            with phase(timings, 'imports'):
+                has_imports, missing_requirements = self._julynter_imports(requirements_file)
+            lineno_order = self.cache['lineno_order']
+            if isinstance(scope, range):
+                last = lineno_order[-1] if lineno_order else 0
+                scope = range(scope.start, min(scope.stop, last + 1))
+            with phase(timings, 'history'):
+                executed_code = self._julynter_history(scope)
+            with phase(timings, 'absolute_paths'):
+                absolute_paths = self._julynter_absolute_paths(scope)
+            result = {
+                'executed_code': executed_code,
+                'cell_dependencies': _select(cell_dependencies, scope),
+                'missing_dependencies': _select(missing_dependencies, scope),
+                'absolute_paths': absolute_paths,
+                'has_imports': [lineno for lineno in has_imports if lineno in scope],
+                'missing_requirements': _select(missing_requirements, scope),
+                'import_times': _select(self.cache['import_times'], scope),
+                'execution_costs': _select(self.cache['execution_costs'], scope),
+                'scope': sorted(scope) if isinstance(scope, set) else [scope.start, scope.stop],
+                'operation': 'queryResult',
+            }
+            if timings is not None:
+                result['timings'] = timings.result()
+                self.stats.add(result['timings'])
+        return result
+
+    def julynter_analyze(self, cells):
+        """Analyze cells that were not executed, without running them or changing the history
+
+        cells is a list of {"id": ..., "source": ...} in notebook order.
+        Names are resolved against the history and the preceding cells of the batch
+        """
+        transform = getattr(self.shell, 'transform_cell', None)
+        new_records = []
+        analysis = []
+        with self.lock:
+            self._parse_cell_trees()
+            self._julynter_dependencies()
+            batch_definitions = set()
+            for cell in cells:
+                source = cell.get('source', '')
+                if transform is not None:
+                    try:
+                        source = transform(source)
+                    except Exception:  # pylint: disable=broad-except
+                        pass
+                record = self._source_record(source, new_records)
+                item = {'id': cell.get('id'), 'valid': record is not None}
+                if record is not None:
+                    defined = batch_definitions.union(record.name_definitions)
+                    item['definitions'] = list(record.name_definitions)
+                    item['usages'] = list(record.name_usages)
+                    item['unresolved'] = [
+                        usage for usage in record.name_usages
+                        if usage not in defined
+                        and not self._name_was_defined_before(usage, sys.maxsize)[0]
+                    ]
+                    item['imports'] = list(record.imports)
+                    batch_definitions.update(record.name_definitions)
+                analysis.append(item)
+            self.store.put_many(new_records)
+        return {
+            'operation': 'analyzeResult',
+            'cells': analysis,
+        }
+
+    def julynter_memory(self, top=DEFAULT_MEMORY_TOP, budget=DEFAULT_MEMORY_BUDGET):
+        """Estimate the largest objects of the user namespace and find their defining cells
+
+        budget is the time limit of the estimation in milliseconds
+        """
+        start = time.perf_counter()
+        largest, complete = julynter_memory(
+            self.shell.user_ns, getattr(self.shell, 'user_ns_hidden', ()), top, budget
+        )
+        with self.lock:
+            self._parse_cell_trees()
+            self._julynter_dependencies()
+            definition_index = self.cache['definition_index']
+            objects = []
+            for name, type_name, size, estimated in largest:
+                lines = definition_index.get(name)
+                objects.append({
+                    'name': name,
+                    'type': type_name,
+                    'size': size,
+                    'estimated': estimated,
+                    'cell': lines[-1] if lines else None,
+                })
+        return {
+            'operation': 'memoryResult',
+            'objects': objects,
+            'complete': complete,
+            'time': (time.perf_counter() - start) * 1000,
+        }
+
+    def julynter_query(
+            self, requirements_file='requirements.txt',
+            versioned=False, since=None, epoch=None, timings=False
+    ):
+        """Extract info from history
+
+        When versioned is set, the result only contains entries that changed
+        after version since of epoch, or all entries if a resync is required.
+        Entries analyzed by the background worker are not analyzed again.
+        When timings or the instrument mode is set, the result has the time
+        and the work of each phase
+        """
+        timings = JulynterTimings(self.counters) if timings or self.instrument else None
+        with self.lock:
+            with phase(timings, 'parse'):
+                self._parse_cell_trees()
+            with phase(timings, 'dependencies'):
+                cell_dependencies, missing_dependencies = self._julynter_dependencies()
+            with phase(timings, 'imports'):
+                has_imports, missing_requirements = self._julynter_imports(requirements_file)
+            with phase(timings, 'history'):
+                executed_code = self._julynter_history()
+            with phase(timings, 'absolute_paths'):
+                absolute_paths = self._julynter_absolute_paths()
+            with phase(timings, 'versions'):
+                self.versions.update({
+                    'executed_code': executed_code,
+                    'cell_dependencies': cell_dependencies,
+                    'missing_dependencies': missing_dependencies,
+                    'absolute_paths': absolute_paths,
+                    'has_imports': has_imports,
+                    'missing_requirements': missing_requirements,
+                    'import_times': self.cache['import_times'],
+                    'execution_costs': self.cache['execution_costs'],
+                })
+                result = self.versions.delta(since, epoch)
+            if timings is not None:
+                result['timings'] = timings.result()
+                self.stats.add(result['timings'])
+        if not versioned:
+            del result['full']
+            del result['removed']
+        result['operation'] = 'queryResult'
         return result
 
     def _parse_cell_trees(self):
-        """Parse python cell trees"""
-        python_trees = self.cache['python_trees']
+        """Parse python cell trees and summarize them in compact records
+
+        The trees are discarded after the summarization.
+        Records of known sources are loaded from the persistent store.
+        Every analysis starts here, so it also stores the queued measures
+        """
+        self._store_measures()
+        cell_records = self.cache['cell_records']
         lineno_order = self.cache['lineno_order']
         lineno_order.clear()
+        new_records = []
         rang = self.history.get_range(raw=False, output=False)
         for _, lineno, inline in rang:
             lineno_order.append(lineno)
-            if lineno in python_trees:
+            if lineno in cell_records:
                 continue
-            if inline.startswith("get_ipython().run_cell_magic(\'time\'"):
-                inline = inline[42:-2].encode('utf-8').decode('unicode_escape')
-            try:
-                python_trees[lineno] = ast.parse(inline)
-            except SyntaxError:
-                python_trees[lineno] = None
+            cell_records[lineno] = self._source_record(inline, new_records)
+        self.store.put_many(new_records)
+        self.counters['history_entries'] += len(lineno_order)
+
+    def _source_record(self, source, new_records):
+        """Return the record of a transformed source, deduplicated by its digest
+
+        Unknown sources are analyzed and appended to new_records
+        """
+        if source.startswith("get_ipython().run_cell_magic(\'time\'"):
+            source = source[42:-2].encode('utf-8').decode('unicode_escape')
+        source_records = self.cache['source_records']
+        digest = source_digest(source)
+        if digest in source_records:
+            self.counters['record_cache_hits'] += 1
+            return source_records[digest]
+        found, record = self.store.get(digest)
+        if found:
+            self.counters['store_hits'] += 1
+        else:
+            self.counters['cells_parsed'] += 1
+            record = self._analyze_source(source)
+            new_records.append((digest, record))
+        if len(source_records) >= MAX_SOURCE_RECORDS:
+            del source_records[next(iter(source_records))]
+        source_records[digest] = record
+        return record
+
+    @staticmethod
+    def _analyze_source(source):
+        """Parse and summarize source. Return None for invalid code"""
+        try:
+            symbols = JulynterCellSymbols(source)
+        except (SyntaxError, ValueError):
+            return None
+        return JulynterCellRecord.from_analysis(symbols, JulynterCellScanner(source))
+
+    def _index_definitions(self, lineno, definitions):
+        """Add the definitions of lineno to the name -> sorted lines index"""
+        definition_index = self.cache['definition_index']
+        for name in definitions:
+            lines = definition_index[name]
+            if not lines or lines[-1] < lineno:
+                lines.append(lineno)
+                continue
+            position = bisect_left(lines, lineno)
+            if lines[position] != lineno:
+                lines.insert(position, lineno)
 
     def _name_was_defined_before(self, usage, lineno):
         """Check if name was defined before lineno"""
-        name_definitions = self.cache['name_definitions']
-        for _, line, _ in reversed(list(self.history.get_range(stop=lineno + 1))):
-            if usage in name_definitions.get(line, []):
-                return (True, line)
+        lines = self.cache['definition_index'].get(usage)
+        if lines:
+            position = bisect_right(lines, lineno)
+            if position:
+                return (True, lines[position - 1])
         is_builtin = (
             usage in {'_', '__', '___', '_sh', 'Out', 'In', 'get_ipython'}
             or usage in self.shell.ns_table
@@ -152,49 +573,61 @@ class JulynterKernel(JulynterComm):
         processed = self.cache['processed']
         cell_dependencies = self.cache['cell_dependencies']
         missing_dependencies = self.cache['missing_dependencies']
-        import_definitions = self.cache['import_definitions']
-        python_trees = self.cache['python_trees']
+        cell_records = self.cache['cell_records']
         lineno_order = self.cache['lineno_order']
+        runtime_accesses = self.cache['runtime_accesses']
 
         for lineno in lineno_order:
-            tree = python_trees.get(lineno, None)
-            if lineno in processed or tree is None:
+            record = cell_records.get(lineno, None)
+            if lineno in processed or record is None:
                 continue
             processed.add(lineno)
-            name_visitor = JulynterNameVisitor()
-            name_visitor.visit(tree)
-            self.cache['name_definitions'][lineno] = name_visitor.name_definitions
-            self.cache['name_usages'][lineno] = name_visitor.name_usages
-            import_definitions[lineno] = name_visitor.import_definition
+            reads, writes = runtime_accesses.get(lineno, ((), ()))
+            self._index_definitions(lineno, record.name_definitions)
+            self._index_definitions(lineno, writes)
+            self.counters['cells_resolved'] += 1
+            self.counters['usages_resolved'] += len(record.name_usages)
             missing_dependencies[lineno] = []
-            for usage in name_visitor.name_usages:
-                found, line = self._name_was_defined_before(usage, lineno)
-                create_dependency = (
-                    found and line is not None
-                    and line != lineno and usage not in import_definitions.get(line, [])
-                )
-                if create_dependency:
-                    cell_dependencies[lineno][usage] = line
-                if not found:
+            for usage in record.name_usages:
+                if not self._add_dependency(usage, lineno):
                     missing_dependencies[lineno].append(usage)
+            for usage in reads:
+                # Names read at runtime exist, even if no cell defined them
+                if usage not in record.name_usages:
+                    self._add_dependency(usage, lineno)
         return cell_dependencies, missing_dependencies
 
+    def _add_dependency(self, usage, lineno):
+        """Add the dependency of lineno on the last definition of usage. Return if it was found"""
+        found, line = self._name_was_defined_before(usage, lineno)
+        create_dependency = (
+            found and line is not None and line != lineno
+            and usage not in self.cache['cell_records'][line].import_definitions
+        )
+        if create_dependency:
+            self.cache['cell_dependencies'][lineno][usage] = line
+        return found
+
     def _reset_import_cache(self, requirements_file):
         """Reset import cache"""
         self.cache['last_requirements'] = requirements_file
+        self.versions.reset()
         self.cache['requirements_checked'].clear()
         self.cache['missing_requirements'].clear()
         self.cache['requirements_processed'].clear()
         self.cache['has_imports'].clear()
 
-    def _check_imports(self, imports, lineno, requirements_file):
-        """Check imports of a cell in requirements_file"""
+    def _check_imports(self, imports, lineno):
+        """Check imports of a cell in the loaded requirements file"""
         checked = self.cache['requirements_checked']
         missing_requirements = self.cache['missing_requirements']
 
         for req in imports:
             if checked.get(req, 5) >= 2:
-                status, msg = _julynter_check_package_version(req, requirements_file)
+                self.counters['imports_checked'] += 1
+                status, msg = _julynter_check_package_version(
+                    req, self.distributions, self.requirements
+                )
                 if status >= 2:
                     missing_requirements[lineno][req] = {
                         'status': status,
@@ -207,76 +640,98 @@ class JulynterKernel(JulynterComm):
         missing_requirements = self.cache['missing_requirements']
         processed = self.cache['requirements_processed']
         has_imports = self.cache['has_imports']
-        python_trees = self.cache['python_trees']
+        cell_records = self.cache['cell_records']
         lineno_order = self.cache['lineno_order']
         if requirements_file != self.cache['last_requirements']:
             self._reset_import_cache(requirements_file)
+        self.requirements.load(requirements_file)
+        if self.distributions.key is not None:
+            self.distributions.refresh()
 
         old_missing = copy(missing_requirements)
         missing_requirements.clear()
         # check if old imports are still missing
         for lineno, requirements in old_missing.items():
-            self._check_imports(requirements.keys(), lineno, requirements_file)
+            self._check_imports(requirements.keys(), lineno)
         # check new imports
         for lineno in lineno_order:
-            tree = python_trees.get(lineno, None)
-            if lineno in processed or tree is None:
+            record = cell_records.get(lineno, None)
+            if lineno in processed or record is None:
                 continue
             processed.add(lineno)
-            import_visitor = JulynterImportVisitor()
-            import_visitor.visit(tree)
-            if import_visitor.imports:
+            if record.imports:
                 has_imports.append(lineno)
-            self._check_imports(import_visitor.imports, lineno, requirements_file)
+            self._check_imports(record.imports, lineno)
         return has_imports, missing_requirements
 
-    def _julynter_history(self):
-        """Return dict of executed code by line number"""
+    def _julynter_history(self, scope=None):
+        """Return dict of executed code by line number
+
+        Explicit cells are read in runs of consecutive line numbers,
+        so sparse scopes do not read the entries between them
+        """
         executed_code = {}
-        for _, lineno, inline in self.history.get_range(raw=True, output=False):
-            executed_code[lineno] = inline
+        if scope is None:
+            ranges = [(None, None)]
+        elif isinstance(scope, range):
+            ranges = [(scope.start, scope.stop)] if scope else []
+        else:
+            ranges = []
+            for lineno in sorted(scope):
+                if ranges and ranges[-1][1] == lineno:
+                    ranges[-1][1] = lineno + 1
+                else:
+                    ranges.append([lineno, lineno + 1])
+        for start, stop in ranges:
+            if start is None:
+                rang = self.history.get_range(raw=True, output=False)
+            else:
+                rang = self.history.get_range(start=start, stop=stop, raw=True, output=False)
+            for _, lineno, inline in rang:
+                executed_code[lineno] = inline
         return executed_code
 
-    def _julynter_absolute_paths(self):
+    def _load_history_entry(self, _field, lineno):
+        """Load raw code of history entry lineno"""
+        for _, _, inline in self.history.get_range(
+                start=lineno, stop=lineno + 1, raw=True, output=False
+        ):
+            return inline
+        return None
+
+    def _julynter_absolute_paths(self, scope=None):
         """Check the existence of absolute paths"""
-        python_trees = self.cache['python_trees']
-        lineno_order = self.cache['lineno_order']
+        cell_records = self.cache['cell_records']
+        lineno_order = self.cache['lineno_order'] if scope is None else scope
+        is_absolute_path = self.path_probe.is_absolute_path
         absolute_paths = {}
         for lineno in lineno_order:
-            tree = python_trees.get(lineno, None)
-            if tree is None:
+            record = cell_records.get(lineno, None)
+            if record is None:
                 continue
-            path_visitor = JulynterPathVisitor()
-            path_visitor.visit(tree)
-            if path_visitor.absolute_paths:
-                absolute_paths[lineno] = list(path_visitor.absolute_paths)
+            self.counters['paths_checked'] += len(record.path_candidates)
+            paths = [
+                string for string in record.path_candidates
+                if is_absolute_path(string)
+            ]
+            if paths:
+                absolute_paths[lineno] = paths
         return absolute_paths
 
     def add_package_to_requirements(self, module_name, requirements):
         """Add module to requirements.txt file"""
-        # pylint: disable=no-self-use
         module_name = module_name.strip()
-        status, msg = _julynter_get_package(module_name)
+        with self.lock:
+            return self._add_package_to_requirements(module_name, requirements)
+
+    def _add_package_to_requirements(self, module_name, requirements):
+        """Add module to requirements.txt file while holding the lock"""
+        self.distributions.refresh()
+        status, msg = _julynter_get_package(module_name, self.distributions)
         if status != -1:
             return (status, msg)
         package = msg
-        try:
-            distribution = pkg_resources.get_distribution(package)
-            version = '=={}'.format(distribution.version)
-        except pkg_resources.DistributionNotFound:
-            version = ''
-        lines = []
-        found = False
-        if os.path.exists(requirements):
-            with open(requirements, 'r') as fil:
-                for line in fil:
-                    if line.strip().startswith(package):
-                        lines.append('{}{}\n'.format(package, version))
-                        found = True
-                    else:
-                        lines.append(line)
-        if not found:
-            lines.append('{}{}\n'.format(package, version))
-        with open(requirements, 'w') as fil:
-            fil.writelines(lines)
+        version = self.distributions.version(package)
+        version = '=={}'.format(version) if version is not None else ''
+        self.requirements.save(requirements, package, '{}{}\n'.format(package, version))
         return (status, msg)
@@ -0,0 +1,123 @@
+"""Estimate the memory footprint of namespace objects"""
+import sys
+import time
+import types
+from itertools import islice
+
+DEFAULT_MEMORY_TOP = 10
+DEFAULT_MEMORY_BUDGET = 200  # milliseconds
+CONTAINER_SAMPLES = 32
+MAX_DEPTH = 3
+
+SEQUENCE_TYPES = (list, tuple)
+SET_TYPES = (set, frozenset)
+SKIPPED_TYPES = (
+    types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, type,
+)
+
+
+def _shallow_size(value):
+    """Return sys.getsizeof of value or 0 if it is not supported"""
+    try:
+        return sys.getsizeof(value)
+    except Exception:  # pylint: disable=broad-except
+        return 0
+
+
+def _fast_size(value):
+    """Return the size of NumPy and pandas objects without traversing them, or None"""
+    module = type(value).__module__.split('.')[0]
+    try:
+        if module == 'numpy' and hasattr(type(value), 'nbytes'):
+            return int(value.nbytes)
+        if module == 'pandas' and hasattr(type(value), 'memory_usage'):
+            usage = value.memory_usage(index=True, deep=False)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    except Exception:  # pylint: disable=broad-except
+        return None
+    return None
+
+
+class JulynterMemoryEstimator(object):
+    """Estimate object sizes within a time budget
+
+    NumPy and pandas objects use their nbytes and memory_usage.
+    Containers add the mean size of sampled items multiplied by their length.
+    Once the deadline is reached, objects are measured with sys.getsizeof only
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, budget=DEFAULT_MEMORY_BUDGET, clock=time.perf_counter):
+        self.clock = clock
+        self.deadline = clock() + budget / 1000
+        self.sampled = False
+
+    @property
+    def expired(self):
+        """Check if the time budget is over"""
+        return self.clock() >= self.deadline
+
+    def size(self, value, depth=MAX_DEPTH):
+        """Estimate the size of value in bytes"""
+        fast = _fast_size(value)
+        if fast is not None:
+            return fast
+        size = _shallow_size(value)
+        if depth <= 0 or self.expired:
+            return size
+        if isinstance(value, dict):
+            length = len(value)
+            items = islice(value.items(), CONTAINER_SAMPLES)
+            sample = [
+                self.size(key, depth - 1) + self.size(item, depth - 1)
+                for key, item in items
+            ]
+        elif isinstance(value, SEQUENCE_TYPES):
+            length = len(value)
+            step = max(1, length // CONTAINER_SAMPLES)
+            sample = [self.size(value[index], depth - 1) for index in range(0, length, step)]
+        elif isinstance(value, SET_TYPES):
+            length = len(value)
+            sample = [self.size(item, depth - 1) for item in islice(value, CONTAINER_SAMPLES)]
+        elif isinstance(getattr(value, '__dict__', None), dict):
+            return size + self.size(vars(value), depth - 1)
+        else:
+            return size
+        if not sample:
+            return size
+        if len(sample) < length:
+            self.sampled = True
+        return size + sum(sample) * length // len(sample)
+
+
+def julynter_memory(namespace, hidden=(), top=DEFAULT_MEMORY_TOP, budget=DEFAULT_MEMORY_BUDGET):
+    """Return the top largest objects of namespace as (name, type name, size, estimated)
+
+    estimated indicates that the size was extrapolated from samples or that the
+    object was not traversed. Objects referenced by many names are counted once.
+    The second result indicates if the time budget allowed all objects to be traversed
+    """
+    estimator = JulynterMemoryEstimator(budget)
+    seen = set()
+    sizes = []
+    complete = True
+    for name, value in list(namespace.items()):
+        if name.startswith('_') or name in hidden or isinstance(value, SKIPPED_TYPES):
+            continue
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if estimator.expired:
+            complete = False
+            size = _fast_size(value)
+            estimated = size is None
+            if estimated:
+                size = _shallow_size(value)
+        else:
+            estimator.sampled = False
+            size = estimator.size(value)
+            estimated = estimator.sampled or estimator.expired
+        sizes.append((name, type(value).__name__, size, estimated))
+    sizes.sort(key=lambda item: item[2], reverse=True)
+    return sizes[:top], complete
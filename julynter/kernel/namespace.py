@@ -0,0 +1,96 @@
+"""Track the global names that executions read and write"""
+import sys
+import types
+import warnings
+
+
+class JulynterTrackingNamespace(dict):
+    """User namespace that records the names read and written through item access
+
+    Module-level code accesses its globals through __getitem__ and __setitem__
+    when the globals are not an exact dict, and functions defined in cells read
+    their globals through __getitem__.
+    Missing names raise KeyError, and the interpreter falls back to builtins.
+    Reads of names that are not in the namespace are discarded by collect.
+    Functions that assign names declared global (STORE_GLOBAL) bypass
+    __setitem__, so these writes are not recorded
+    """
+    __slots__ = ('reads', 'writes')
+
+    def __init__(self, *args, **kwargs):
+        super(JulynterTrackingNamespace, self).__init__(*args, **kwargs)
+        self.reads = set()
+        self.writes = set()
+
+    def __getitem__(self, key, _getitem=dict.__getitem__):
+        self.reads.add(key)
+        return _getitem(self, key)
+
+    def __setitem__(self, key, value):
+        self.writes.add(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.writes.add(key)
+        dict.__delitem__(self, key)
+
+    def collect(self, ignored=()):
+        """Return and reset the user names (reads, writes) recorded since the last call"""
+        reads, writes = self.reads, self.writes
+        self.reads = set()
+        self.writes = set()
+        return (
+            {
+                name for name in reads
+                if dict.__contains__(self, name)
+                and not name.startswith('_') and name not in ignored
+            },
+            {name for name in writes if not name.startswith('_') and name not in ignored},
+        )
+
+
+def _defined_by_user(value, namespace):
+    """Check if value is a function or class that refers to namespace as its globals"""
+    if isinstance(value, types.FunctionType):
+        return value.__globals__ is namespace
+    if isinstance(value, type):
+        return any(
+            getattr(attr, '__globals__', None) is namespace
+            for attr in vars(value).values()
+        )
+    return False
+
+
+def install_tracking_namespace(shell):
+    """Replace the user namespace of shell by a JulynterTrackingNamespace
+
+    Functions keep a reference to the namespace of their definition, so the
+    replacement is refused if the user already defined functions or classes.
+    Return the new namespace or None
+    """
+    # pylint: disable=import-outside-toplevel
+    from IPython.core.interactiveshell import DummyMod
+    old = shell.user_ns
+    if isinstance(old, JulynterTrackingNamespace):
+        return old
+    if old is not shell.user_global_ns or any(
+            _defined_by_user(value, old) for value in list(old.values())
+    ):
+        warnings.warn(
+            'Julynter namespace tracking must be enabled before defining functions'
+        )
+        return None
+    namespace = JulynterTrackingNamespace(old)
+    module = DummyMod()
+    module.__dict__ = namespace
+    if sys.modules.get(namespace.get('__name__')) is shell.user_module:
+        sys.modules[namespace['__name__']] = module
+    shell.user_module = module
+    shell.user_ns = namespace
+    shell.ns_table['user_global'] = namespace
+    shell.ns_table['user_local'] = namespace
+    completer = getattr(shell, 'Completer', None)
+    if completer is not None:
+        completer.namespace = namespace
+        completer.global_namespace = namespace
+    return namespace
@@ -0,0 +1,77 @@
+"""Probe the filesystem for absolute paths with a cache"""
+import os
+import time
+
+DEFAULT_PATH_TTL = 5.0
+MAX_PATH_LENGTH = 4096
+
+
+def looks_like_absolute_path(string):
+    """Lexical check that discards strings that cannot be absolute paths"""
+    return (
+        0 < len(string) <= MAX_PATH_LENGTH
+        and os.path.isabs(string)
+        and '\n' not in string
+        and '\0' not in string
+    )
+
+
+class JulynterPathProbe(object):
+    """Check the existence of absolute paths caching the results
+
+    A cached result is reused while the mtime of the parent directory does not change.
+    The parent directory mtime is checked again only after ttl seconds.
+    Filesystem calls and cache hits are added to counters.
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, ttl=DEFAULT_PATH_TTL, clock=time.monotonic, counters=None):
+        self.ttl = ttl
+        self.clock = clock
+        self.counters = counters if counters is not None else {}
+        for key in ('files_stated', 'path_cache_hits', 'path_cache_misses'):
+            self.counters.setdefault(key, 0)
+        self.directories = {}
+        self.paths = {}
+
+    def clear(self):
+        """Clear cached results"""
+        self.directories.clear()
+        self.paths.clear()
+
+    def _directory_mtime(self, directory, now):
+        """Return the mtime of directory or None if it does not exist"""
+        cached = self.directories.get(directory)
+        if cached is not None and now - cached[1] < self.ttl:
+            return cached[0]
+        self.counters['files_stated'] += 1
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except (OSError, ValueError):
+            mtime = None
+        self.directories[directory] = (mtime, now)
+        return mtime
+
+    def exists(self, path):
+        """Check if path exists"""
+        now = self.clock()
+        mtime = self._directory_mtime(os.path.dirname(path), now)
+        cached = self.paths.get(path)
+        if cached is not None and cached[1] == mtime:
+            self.counters['path_cache_hits'] += 1
+            return cached[0]
+        self.counters['path_cache_misses'] += 1
+        exists = mtime is not None and os.path.exists(path)
+        if mtime is not None:
+            self.counters['files_stated'] += 1
+        self.paths[path] = (exists, mtime)
+        return exists
+
+    def is_absolute_path(self, string):
+        """Check if string is an existing absolute path"""
+        if string == '/' or not looks_like_absolute_path(string):
+            return False
+        stripped = string.rstrip('/')
+        if os.path.abspath(stripped) != stripped:
+            return False
+        return self.exists(stripped)
@@ -0,0 +1,55 @@
+"""Compact analysis records of executed cells"""
+import sys
+
+from .paths import looks_like_absolute_path
+
+
+def _intern_tuple(names):
+    """Return a sorted tuple of interned names"""
+    return tuple(sorted(sys.intern(name) for name in names))
+
+
+def _unique(values):
+    """Return a tuple of unique values preserving the order"""
+    return tuple(dict.fromkeys(values))
+
+
+class JulynterCellRecord(object):
+    """Summary of the analysis of a cell. The cell tree is not retained"""
+    # pylint: disable=useless-object-inheritance
+    __slots__ = (
+        'name_definitions', 'name_usages', 'import_definitions',
+        'imports', 'path_candidates'
+    )
+
+    def __init__(
+            self, name_definitions=(), name_usages=(), import_definitions=(),
+            imports=(), path_candidates=()
+    ):
+        # pylint: disable=too-many-arguments
+        self.name_definitions = _intern_tuple(name_definitions)
+        self.name_usages = _intern_tuple(name_usages)
+        self.import_definitions = _intern_tuple(import_definitions)
+        self.imports = _unique(sys.intern(name) for name in imports)
+        self.path_candidates = _unique(path_candidates)
+
+    @classmethod
+    def from_analysis(cls, symbols, scanner):
+        """Create record from JulynterCellSymbols and JulynterCellScanner.
+        Keep only strings that may be paths"""
+        return cls(
+            symbols.name_definitions, symbols.name_usages, symbols.import_definition,
+            scanner.imports, sorted(
+                string for string in scanner.strings
+                if looks_like_absolute_path(string)
+            )
+        )
+
+    def to_list(self):
+        """Return record fields as a JSON serializable list"""
+        return [list(getattr(self, slot)) for slot in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values):
+        """Create record from the result of to_list"""
+        return cls(*values)
@@ -0,0 +1,83 @@
+"""Parse requirements files once and reload them only when they change"""
+import os
+import re
+
+REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+def normalize_name(name):
+    """Normalize package name for comparison"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def requirement_name(line):
+    """Extract normalized package name from requirement line"""
+    if line.lstrip().startswith(('#', '-')):
+        return None
+    match = REQUIREMENT_NAME.match(line)
+    if not match:
+        return None
+    return normalize_name(match.group(1))
+
+
+class JulynterRequirements(object):
+    """Requirements file index mapping package names to requirement lines
+
+    The file is parsed again only when its path, mtime, or size changes.
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self):
+        self.key = None
+        self.lines = []
+        self.index = {}
+
+    def _stat_key(self, path):
+        """Return the cache key of path or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def load(self, path):
+        """Load requirements file if it changed. Return whether it exists"""
+        key = self._stat_key(path)
+        if key is None:
+            self.key = None
+            self.lines = []
+            self.index = {}
+            return False
+        if key != self.key:
+            with open(path, 'r') as fil:
+                self.lines = fil.readlines()
+            self.index = {}
+            for position, line in enumerate(self.lines):
+                name = requirement_name(line)
+                if name is not None and name not in self.index:
+                    self.index[name] = position
+            self.key = key
+        return True
+
+    def get(self, package):
+        """Return requirement line of package or None"""
+        position = self.index.get(normalize_name(package))
+        if position is None:
+            return None
+        return self.lines[position]
+
+    def save(self, path, package, line):
+        """Replace or add the requirement line of package and write the file"""
+        self.load(path)
+        name = normalize_name(package)
+        position = self.index.get(name)
+        if position is None:
+            self.index[name] = len(self.lines)
+            if self.lines and not self.lines[-1].endswith('\n'):
+                self.lines[-1] += '\n'
+            self.lines.append(line)
+        else:
+            self.lines[position] = line
+        with open(path, 'w') as fil:
+            fil.writelines(self.lines)
+        self.key = self._stat_key(path)
@@ -0,0 +1,87 @@
+"""Collect imports and string literals without building syntax trees"""
+import ast
+import re
+
+_PREFIX = r"(?:[rR][bBfF]?|[bBfF][rR]?|[uU])?"
+_LITERAL = _PREFIX + (
+    r"(?s:'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r'|"(?:[^"\\\n]|\\.)*")'
+)
+_SPACE = r"(?:[ \t]|\\\r?\n)"
+# A comment always ends at the end of the line, which avoids backtracking
+_COMMENT = r"#[^\r\n]*(?![^\r\n])"
+
+# Comments and strings are matched first, so keywords inside them are skipped.
+# import and from are keywords, so they only appear in import statements,
+# except for "yield from" and "raise ... from", which are not followed by import.
+# Adjacent literals are concatenated, like the parser does
+_TOKENS = re.compile(
+    # Positions that cannot start a token fail at the first character
+    r"(?=[#'\"rRbBfFuUi])(?:"
+    r"(?P<comment>{comment})"
+    r"|(?P<strings>{literal}(?:(?:\s|\\\r?\n|{comment})*{literal})*)"
+    r"|\bfrom{space}+(?P<module>[\w.]+){space}+import\b"
+    r"|\bimport{space}+(?P<names>(?:[\w.,]|{space})+))".format(
+        literal=_LITERAL, space=_SPACE, comment=_COMMENT
+    )
+)
+_CONTINUATION = re.compile(r"\\\r?\n")
+
+
+class _StringVisitor(ast.NodeVisitor):
+    """Collect the str constants of an expression"""
+    # pylint: disable=invalid-name
+
+    def __init__(self, strings):
+        self.strings = strings
+
+    def visit_Constant(self, node):
+        """Visit Constant Node"""
+        if isinstance(node.value, str):
+            self.strings.add(node.value)
+
+    def visit_Str(self, node):
+        """Visit Str Node (Python < 3.8)"""
+        self.strings.add(node.s)
+
+
+class JulynterCellScanner(object):
+    """Collect imported modules and string literals of valid code in a single scan
+
+    Names are collected by JulynterCellSymbols, which is aware of scopes.
+    Only string literals with characters of absolute paths are evaluated,
+    since the other strings are discarded by the records
+    """
+    # pylint: disable=useless-object-inheritance, too-few-public-methods
+
+    def __init__(self, source):
+        self.imports = []
+        self.strings = set()
+        if 'import' not in source and '"' not in source and "'" not in source:
+            # Sources without these tokens have neither imports nor strings
+            return
+        for match in _TOKENS.finditer(source):
+            kind = match.lastgroup
+            if kind == 'strings':
+                self._add_strings(match.group('strings'))
+            elif kind == 'module':
+                module = match.group('module')
+                if not module.startswith('.'):
+                    self.imports.append(module.split('.')[0])
+            elif kind == 'names':
+                names = _CONTINUATION.sub(' ', match.group('names'))
+                for alias in names.split(','):
+                    if alias.strip():
+                        self.imports.append(alias.split()[0].split('.')[0])
+
+    def _add_strings(self, literals):
+        """Evaluate a run of adjacent string literals that may have an absolute path"""
+        if '/' not in literals and '\\' not in literals and ':' not in literals:
+            return
+        try:
+            tree = ast.parse('(' + literals + '\n)', mode='eval')
+        except (SyntaxError, ValueError):
+            return
+        _StringVisitor(self.strings).visit(tree)
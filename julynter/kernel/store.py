@@ -0,0 +1,56 @@
+"""Persistent analysis cache shared by kernels"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from ..config import CONFIG_DIR
+from ..sqlitestore import SQLiteStore
+from .records import JulynterCellRecord
+
+# Change it whenever the analysis changes to invalidate old records
+ANALYSIS_VERSION = 2
+
+DEFAULT_ANALYSIS_CACHE = Path.home() / CONFIG_DIR / 'analysis.sqlite'
+
+
+def source_digest(source):
+    """Return the cache key of a transformed cell source"""
+    key = '{}:{}.{}:'.format(ANALYSIS_VERSION, *sys.version_info[:2])
+    return hashlib.sha256((key + source).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class JulynterRecordStore(SQLiteStore):
+    """SQLite store of JulynterCellRecord by source digest
+
+    The store is disabled after the first database error, so linting
+    keeps working with read-only or locked home directories
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS records '
+        '(digest TEXT PRIMARY KEY, record TEXT)',
+    )
+
+    def __init__(self, path=DEFAULT_ANALYSIS_CACHE, timeout=5.0):
+        super(JulynterRecordStore, self).__init__(path, timeout)
+
+    def get(self, digest):
+        """Return (found, record) for digest. Records of invalid cells are None"""
+        row = self._fetchone('SELECT record FROM records WHERE digest = ?', (digest,))
+        if row is None:
+            return (False, None)
+        try:
+            values = json.loads(row[0])
+            return (True, None if values is None else JulynterCellRecord.from_list(values))
+        except (ValueError, TypeError):
+            return (False, None)
+
+    def put_many(self, items):
+        """Store (digest, record) items in a single transaction"""
+        self._write(
+            'INSERT OR IGNORE INTO records (digest, record) VALUES (?, ?)',
+            [
+                (digest, json.dumps(None if record is None else record.to_list()))
+                for digest, record in items
+            ]
+        )
@@ -0,0 +1,46 @@
+"""Collect scope-aware names with the symtable module"""
+import symtable
+
+
+class JulynterCellSymbols(object):
+    """Collect global names defined and read by a cell
+
+    Definitions are module-level bindings and names declared global in nested scopes.
+    Usages are module-level references and free global references in nested scopes.
+    Names that are local to functions, lambdas, classes, and comprehensions are ignored.
+    """
+    # pylint: disable=useless-object-inheritance, too-few-public-methods
+
+    def __init__(self, source):
+        self.name_definitions = set()
+        self.name_usages = set()
+        self.import_definition = set()
+        table = symtable.symtable(source, '<cell>', 'exec')
+        for symbol in table.get_symbols():
+            name = symbol.get_name()
+            if symbol.is_imported():
+                self.name_definitions.add(name)
+                self.import_definition.add(name)
+            elif symbol.is_assigned():
+                self.name_definitions.add(name)
+            if symbol.is_referenced():
+                self.name_usages.add(name)
+        for child in table.get_children():
+            self._visit_nested(child)
+
+    def _visit_nested(self, table):
+        """Collect global names of a nested scope and its children"""
+        for symbol in table.get_symbols():
+            if not symbol.is_global():
+                continue
+            name = symbol.get_name()
+            if symbol.is_declared_global():
+                if symbol.is_imported():
+                    self.name_definitions.add(name)
+                    self.import_definition.add(name)
+                elif symbol.is_assigned():
+                    self.name_definitions.add(name)
+            if symbol.is_referenced():
+                self.name_usages.add(name)
+        for child in table.get_children():
+            self._visit_nested(child)
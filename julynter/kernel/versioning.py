@@ -0,0 +1,125 @@
+"""Version query results to reply only with changed entries"""
+import uuid
+from collections import OrderedDict
+from copy import deepcopy
+
+LIST_FIELDS = {'has_imports'}
+# History entries never change for a line number, so existing keys are not compared
+IMMUTABLE_FIELDS = {'executed_code'}
+
+
+class _Evicted(object):
+    """Placeholder of a string value evicted from memory"""
+    # pylint: disable=useless-object-inheritance, too-few-public-methods
+    __slots__ = ()
+
+
+_EVICTED = _Evicted()
+
+
+class JulynterResultVersions(object):
+    """Stamp query result entries with the version in which they changed
+
+    limits maps fields to the maximum number of values kept in memory.
+    Older string values of these fields are evicted and obtained again
+    through loader(field, key) when a reply requires them. Evicted values
+    cannot be compared, so limits are meant for IMMUTABLE_FIELDS
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, limits=None, loader=None):
+        self.epoch = None
+        self.version = 0
+        self.entries = {}
+        self.removed = {}
+        self.kept = {}
+        self.limits = limits or {}
+        self.loader = loader
+        self.reset()
+
+    def reset(self):
+        """Start a new epoch. Clients of the old epoch receive a full resync"""
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.entries.clear()
+        self.removed.clear()
+        self.kept.clear()
+
+    def update(self, fields):
+        """Compare fields with the last known state and stamp the changes"""
+        new_version = self.version + 1
+        changed = False
+        for field, values in fields.items():
+            if field in LIST_FIELDS:
+                values = dict.fromkeys(values, True)
+            entries = self.entries.setdefault(field, {})
+            removed = self.removed.setdefault(field, {})
+            immutable = field in IMMUTABLE_FIELDS
+            for key, value in values.items():
+                old = entries.get(key)
+                if old is None or (not immutable and old[1] != value):
+                    entries[key] = (new_version, deepcopy(value))
+                    removed.pop(key, None)
+                    self._keep(field, key)
+                    changed = True
+            for key in [key for key in entries if key not in values]:
+                del entries[key]
+                removed[key] = new_version
+                self.kept.get(field, {}).pop(key, None)
+                changed = True
+        if changed:
+            self.version = new_version
+        return self.version
+
+    def _keep(self, field, key):
+        """Keep the value of key in memory, evicting the oldest values above the limit"""
+        limit = self.limits.get(field)
+        if limit is None:
+            return
+        kept = self.kept.setdefault(field, OrderedDict())
+        kept[key] = True
+        kept.move_to_end(key)
+        entries = self.entries[field]
+        while len(kept) > limit:
+            old_key, _ = kept.popitem(last=False)
+            version, value = entries[old_key]
+            if isinstance(value, str):
+                entries[old_key] = (version, _EVICTED)
+
+    def _value(self, field, key, value):
+        """Return value, loading it if it was evicted"""
+        if value is _EVICTED:
+            return self.loader(field, key)
+        return value
+
+    def is_full(self, since, epoch):
+        """Check if a client that knows version since of epoch requires a full resync"""
+        return (
+            since is None or epoch != self.epoch
+            or not isinstance(since, int) or since > self.version
+        )
+
+    def delta(self, since=None, epoch=None):
+        """Return entries changed after version since"""
+        full = self.is_full(since, epoch)
+        result = {
+            'version': self.version,
+            'epoch': self.epoch,
+            'full': full,
+            'removed': {},
+        }
+        for field, entries in self.entries.items():
+            values = {
+                key: self._value(field, key, value)
+                for key, (version, value) in entries.items()
+                if full or version > since
+            }
+            result[field] = list(values) if field in LIST_FIELDS else values
+            if not full:
+                removed = [
+                    key for key, version in self.removed[field].items()
+                    if version > since
+                ]
+                if removed:
+                    result['removed'][field] = removed
+        return result
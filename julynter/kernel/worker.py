@@ -0,0 +1,49 @@
+"""Run kernel analysis in a background thread"""
+import queue
+import threading
+import traceback
+
+
+class JulynterWorker(object):
+    """Run a function in a background thread whenever it is scheduled
+
+    Schedules that arrive while the function is running are coalesced into a single run.
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, function, name='julynter-worker'):
+        self.function = function
+        self.name = name
+        self.queue = queue.Queue()
+        self.thread = None
+        self.last_error = None
+
+    def start(self):
+        """Start worker thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+
+    def schedule(self):
+        """Schedule a function run"""
+        self.queue.put(True)
+
+    def stop(self):
+        """Stop worker thread after the current run"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread = None
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            items = [self.queue.get()]
+            while not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            if None in items:
+                return
+            try:
+                self.function()
+                self.last_error = None
+            except Exception:  # pylint: disable=broad-except
+                self.last_error = traceback.format_exc()
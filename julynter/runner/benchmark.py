@@ -0,0 +1,130 @@
+"""Compare the kernel startup latency of kernel providers
+
+Run as ``python -m julynter.runner.benchmark [kernel] [runs]``.
+Each run measures the time to get a kernel and execute the imports of
+DEFAULT_PREIMPORTS in it, which is what a typical notebook does first.
+When matplotlib is installed, it also checks that each provider produces
+the inline image/png output of a plot, and exits with status 1 otherwise
+"""
+import importlib.util
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from jupyter_client.manager import KernelManager
+
+from .forkserver import ForkServer, DEFAULT_PREIMPORTS
+from .pool import KernelPool
+
+
+class FreshKernels(object):
+    """Kernel provider that starts a new kernel for each notebook, like Runner does by default"""
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, startup_timeout=60):
+        self.startup_timeout = startup_timeout
+
+    @contextmanager
+    def kernel(self, kernel_name, cwd):
+        """Start a kernel in cwd and shut it down afterwards"""
+        manager = KernelManager(kernel_name=kernel_name)
+        manager.start_kernel(cwd=str(cwd))
+        try:
+            client = manager.client()
+            client.start_channels()
+            try:
+                client.wait_for_ready(timeout=self.startup_timeout)
+            finally:
+                client.stop_channels()
+            yield manager
+        finally:
+            manager.shutdown_kernel(now=True)
+
+    def close(self):
+        """Nothing to close"""
+
+
+PLOT_CODE = """
+import matplotlib.pyplot as plt
+plt.plot([1, 2, 3])
+plt.show()
+"""
+
+
+def _execute(manager, code, timeout=60):
+    """Execute code in the kernel of manager and return its output messages"""
+    outputs = []
+    client = manager.client()
+    client.start_channels()
+    try:
+        client.wait_for_ready(timeout=timeout)
+        client.execute_interactive(code, store_history=False, timeout=timeout,
+                                   output_hook=outputs.append)
+    finally:
+        client.stop_channels()
+    return outputs
+
+
+def measure(provider, kernel_name, runs, modules=DEFAULT_PREIMPORTS):
+    """Return the latencies in seconds of getting a kernel and importing modules"""
+    code = '\n'.join(
+        'try:\n    import {0}\nexcept ImportError:\n    pass'.format(module)
+        for module in modules
+    )
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with provider.kernel(kernel_name, os.getcwd()) as manager:
+            _execute(manager, code)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def plots_inline(provider, kernel_name):
+    """Check if a plot of a kernel of provider produces an image/png output"""
+    with provider.kernel(kernel_name, os.getcwd()) as manager:
+        outputs = _execute(manager, PLOT_CODE)
+    return any(
+        'image/png' in msg['content'].get('data', {})
+        for msg in outputs if msg['msg_type'] in ('display_data', 'execute_result')
+    )
+
+
+def main(kernel_name='python3', runs=5):
+    """Print the startup latencies of FreshKernels, KernelPool and ForkServer
+
+    Return the exit status of the plot checks
+    """
+    runs = int(runs)
+    check_plots = importlib.util.find_spec('matplotlib') is not None
+    failures = []
+    providers = [
+        ('fresh', FreshKernels()),
+        ('pool', KernelPool()),
+        ('forkserver', ForkServer()),
+    ]
+    for name, provider in providers:
+        try:
+            if name == 'pool':
+                # Do not measure the first start of the pool
+                provider.prestart(kernel_name)
+                with provider.kernel(kernel_name, os.getcwd()):
+                    pass
+            elif name == 'forkserver':
+                provider.start()
+            latencies = sorted(measure(provider, kernel_name, runs))
+            if check_plots and not plots_inline(provider, kernel_name):
+                failures.append("{}: plot without image/png output".format(name))
+        finally:
+            provider.close()
+        print("{}: median {:.3f}s, min {:.3f}s, max {:.3f}s".format(
+            name, latencies[len(latencies) // 2], latencies[0], latencies[-1]
+        ))
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,242 @@
+"""Fork kernels from a template process with pre-imported modules
+
+Run as ``python -m julynter.runner.forkserver <module>...`` to start the
+template process. It imports the modules and ipykernel, and then forks a
+kernel for each JSON request ``{"connection_file": ..., "cwd": ...}`` it
+reads from stdin, replying ``{"pid": ...}`` on stdout.
+Forked kernels share the memory of the pre-imported modules (copy-on-write)
+"""
+import importlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+
+from jupyter_client.kernelspec import KernelSpecManager
+from jupyter_client.manager import KernelManager
+
+DEFAULT_PREIMPORTS = ('numpy', 'pandas', 'matplotlib', 'sklearn')
+
+
+def _child(app_class, connection_file, cwd):
+    """Start a kernel of app_class in the forked process. Never returns"""
+    # pylint: disable=broad-except
+    try:
+        os.setsid()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 0)
+        os.dup2(devnull, 1)
+        os.chdir(cwd)
+        sys.path[0] = ''
+        app_class.launch_instance(argv=['-f', connection_file])
+    except BaseException:
+        os._exit(1)  # pylint: disable=protected-access
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def serve(modules):
+    """Import modules and fork a kernel for each request of stdin"""
+    # pylint: disable=import-outside-toplevel
+    # Preload the kernel application for the forked children
+    from ipykernel.kernelapp import IPKernelApp
+    # matplotlib reads the backend when it is imported, which happens before
+    # the kernel application selects the inline backend
+    os.environ.setdefault('MPLBACKEND', 'module://matplotlib_inline.backend_inline')
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as exc:  # pylint: disable=broad-except
+            print("Failed to pre-import {}: {}".format(module, exc), file=sys.stderr)
+    # Forked kernels are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    out = sys.stdout
+    out.write(json.dumps({'ready': True}) + '\n')
+    out.flush()
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            _child(IPKernelApp, request['connection_file'], request['cwd'])
+        out.write(json.dumps({'pid': pid}) + '\n')
+        out.flush()
+
+
+class ForkedKernel(object):
+    """Popen-like handle of a kernel forked by the fork server"""
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def poll(self):
+        """Return None while the kernel is alive"""
+        try:
+            os.kill(self.pid, 0)
+        except OSError:
+            return 0
+        return None
+
+    def send_signal(self, signum):
+        """Send signal to the kernel"""
+        try:
+            os.kill(self.pid, signum)
+        except OSError:
+            pass
+
+    def kill(self):
+        """Kill the kernel"""
+        self.send_signal(signal.SIGKILL)
+
+
+class ForkServer(object):
+    """Template process that forks kernels with pre-imported modules
+
+    It implements the kernel provider interface of Runner (kernel_specs, supports,
+    and kernel), like KernelPool. Only Python kernelspecs that run the same
+    interpreter are supported, since the kernels are forked from this interpreter.
+    Forking is not available on Windows
+    """
+    # pylint: disable=useless-object-inheritance
+
+    def __init__(self, modules=DEFAULT_PREIMPORTS, startup_timeout=60, vindex=3):
+        self.modules = list(modules)
+        self.startup_timeout = startup_timeout
+        self.vindex = vindex
+        self.lock = threading.Lock()
+        self.process = None
+        self._specs = None
+
+    def start(self):
+        """Start the template process and wait for the pre-imports"""
+        with self.lock:
+            if self.process is not None:
+                return
+            self.process = subprocess.Popen(
+                [sys.executable, '-m', 'julynter.runner.forkserver'] + self.modules,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True,
+            )
+            self._read()
+
+    def _read(self):
+        """Read a reply of the template process"""
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Fork server exited")
+        return json.loads(line)
+
+    def fork(self, connection_file, cwd):
+        """Fork a kernel and return its ForkedKernel"""
+        self.start()
+        with self.lock:
+            self.process.stdin.write(json.dumps({
+                'connection_file': str(connection_file),
+                'cwd': str(cwd),
+            }) + '\n')
+            self.process.stdin.flush()
+            return ForkedKernel(self._read()['pid'])
+
+    def all_specs(self):
+        """Return the cached KernelSpecManager.get_all_specs result"""
+        if self._specs is None:
+            self._specs = KernelSpecManager().get_all_specs()
+        return self._specs
+
+    def kernel_specs(self):
+        """Return the cached {name: resource_dir} of kernelspecs"""
+        return {name: spec['resource_dir'] for name, spec in self.all_specs().items()}
+
+    def supports(self, kernel_name):
+        """Check if kernel_name is a Python kernelspec of this interpreter"""
+        spec = self.all_specs().get(kernel_name)
+        if spec is None or spec['spec'].get('language') != 'python' or os.name != 'posix':
+            return False
+        argv = spec['spec'].get('argv') or ['']
+        executable = shutil.which(argv[0]) or argv[0]
+        return os.path.realpath(executable) == os.path.realpath(sys.executable)
+
+    @contextmanager
+    def kernel(self, kernel_name, cwd):
+        """Fork a kernel for a notebook in cwd and shut it down afterwards"""
+        # pylint: disable=unused-argument
+        manager = ForkedKernelManager(server=self)
+        manager.start_kernel(cwd=cwd)
+        try:
+            manager.wait_ready(self.startup_timeout)
+            yield manager
+        finally:
+            manager.shutdown_kernel(now=True)
+
+    def close(self):
+        """Stop the template process"""
+        with self.lock:
+            if self.process is None:
+                return
+            self.process.stdin.close()
+            self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ForkedKernelManager(KernelManager):
+    """KernelManager of a kernel forked by a ForkServer"""
+
+    def __init__(self, server=None, **kwargs):
+        super(ForkedKernelManager, self).__init__(**kwargs)
+        self.server = server
+        self.forked = None
+
+    @property
+    def has_kernel(self):
+        """Check if the kernel was forked"""
+        return self.forked is not None
+
+    def start_kernel(self, cwd='.', **_kwargs):
+        """Write the connection file and ask the fork server for a kernel in cwd"""
+        # pylint: disable=arguments-differ
+        self.write_connection_file()
+        self.forked = self.server.fork(self.connection_file, cwd)
+
+    def wait_ready(self, timeout):
+        """Wait until the kernel answers"""
+        client = self.client()
+        client.start_channels()
+        try:
+            client.wait_for_ready(timeout=timeout)
+        finally:
+            client.stop_channels()
+
+    def is_alive(self):
+        """Check if the forked kernel is running"""
+        return self.forked is not None and self.forked.poll() is None
+
+    def interrupt_kernel(self):
+        """Interrupt the forked kernel"""
+        if self.forked is not None:
+            self.forked.send_signal(signal.SIGINT)
+
+    def signal_kernel(self, signum):
+        """Send signum to the forked kernel"""
+        if self.forked is not None:
+            self.forked.send_signal(signum)
+
+    def shutdown_kernel(self, now=False, restart=False):
+        """Kill the forked kernel and remove its connection file"""
+        # pylint: disable=unused-argument
+        if self.forked is not None:
+            self.forked.kill()
+            self.forked = None
+        self.cleanup_connection_file()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1:])
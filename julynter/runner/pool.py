@@ -0,0 +1,190 @@
+"""Pool of warm kernels for notebook execution"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from jupyter_client.kernelspec import KernelSpecManager
+from jupyter_client.manager import KernelManager
+
+from ..util import vprint
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_STARTUP_TIMEOUT = 60
+
+CHDIR_CODE = "__import__('os').chdir({!r})"
+
+
+class KernelPool(object):
+    """Keep started kernels for each kernelspec and hand out a clean kernel per notebook
+
+    Kernelspecs are discovered once for the life of the pool.
+    Returned kernels are restarted (or replaced) in background threads.
+    Only kernels of Python kernelspecs are pooled, since the pool changes the
+    working directory of a borrowed kernel with Python code.
+    When a pooled kernel fails to start, the next borrower gets a new kernel
+    that is not pooled instead of waiting for it
+    """
+    # pylint: disable=useless-object-inheritance, too-many-instance-attributes
+
+    def __init__(
+            self, size=DEFAULT_POOL_SIZE, startup_timeout=DEFAULT_STARTUP_TIMEOUT,
+            vindex=3
+    ):
+        self.size = size
+        self.startup_timeout = startup_timeout
+        self.vindex = vindex
+        self.lock = threading.Lock()
+        self.available = {}
+        self.managers = set()
+        self.closed = False
+        self.executor = ThreadPoolExecutor(max_workers=max(1, size))
+        self._specs = None
+
+    def kernel_specs(self):
+        """Return the cached {name: resource_dir} of kernelspecs"""
+        return {name: spec['resource_dir'] for name, spec in self.all_specs().items()}
+
+    def all_specs(self):
+        """Return the cached KernelSpecManager.get_all_specs result"""
+        with self.lock:
+            if self._specs is None:
+                self._specs = KernelSpecManager().get_all_specs()
+            return self._specs
+
+    def supports(self, kernel_name):
+        """Check if kernels of kernel_name can be pooled"""
+        spec = self.all_specs().get(kernel_name)
+        return spec is not None and spec['spec'].get('language') == 'python'
+
+    def prestart(self, kernel_name):
+        """Start kernels of kernel_name in background until the pool is full"""
+        with self.lock:
+            if self.closed or kernel_name in self.available:
+                return
+            self.available[kernel_name] = Queue()
+        for _ in range(self.size):
+            self.executor.submit(self._start, kernel_name)
+
+    def _wait_ready(self, manager):
+        """Wait until the kernel answers"""
+        client = manager.client()
+        client.start_channels()
+        try:
+            client.wait_for_ready(timeout=self.startup_timeout)
+        finally:
+            client.stop_channels()
+
+    def _start(self, kernel_name):
+        """Start a kernel and make it available"""
+        manager = KernelManager(kernel_name=kernel_name)
+        with self.lock:
+            self.managers.add(manager)
+        try:
+            manager.start_kernel()
+            self._wait_ready(manager)
+        except Exception as exc:  # pylint: disable=broad-except
+            vprint(self.vindex, "Failed to start pooled kernel {}: {}".format(kernel_name, exc))
+            self._discard(manager)
+            with self.lock:
+                if not self.closed:
+                    # Wake up a borrower instead of leaving the slot empty
+                    self.available[kernel_name].put(exc)
+            return
+        self._release(kernel_name, manager)
+
+    def _recycle(self, kernel_name, manager):
+        """Restart a used kernel or replace it by a new one"""
+        try:
+            manager.restart_kernel(now=True)
+            self._wait_ready(manager)
+        except Exception:  # pylint: disable=broad-except
+            self._discard(manager)
+            self._start(kernel_name)
+            return
+        self._release(kernel_name, manager)
+
+    def _release(self, kernel_name, manager):
+        """Make manager available or shut it down if the pool is closed"""
+        with self.lock:
+            if not self.closed:
+                self.available[kernel_name].put(manager)
+                return
+        self._discard(manager)
+
+    def _discard(self, manager):
+        """Shut down manager and forget it"""
+        with self.lock:
+            self.managers.discard(manager)
+        try:
+            manager.shutdown_kernel(now=True)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def _prepare(self, manager, cwd):
+        """Change the working directory of a borrowed kernel"""
+        client = manager.client()
+        client.start_channels()
+        try:
+            client.wait_for_ready(timeout=self.startup_timeout)
+            msg_id = client.execute(CHDIR_CODE.format(str(cwd)), silent=True, store_history=False)
+            while True:
+                reply = client.get_shell_msg(timeout=self.startup_timeout)
+                if reply['parent_header'].get('msg_id') == msg_id:
+                    break
+        finally:
+            client.stop_channels()
+        if reply['content']['status'] != 'ok':
+            raise RuntimeError("Failed to change kernel directory to {}".format(cwd))
+
+    @contextmanager
+    def _fresh_kernel(self, kernel_name, cwd):
+        """Start a kernel that is not pooled and retry the failed slot in background"""
+        with self.lock:
+            if not self.closed:
+                self.executor.submit(self._start, kernel_name)
+        manager = KernelManager(kernel_name=kernel_name)
+        manager.start_kernel(cwd=str(cwd))
+        try:
+            self._wait_ready(manager)
+            yield manager
+        finally:
+            manager.shutdown_kernel(now=True)
+
+    @contextmanager
+    def kernel(self, kernel_name, cwd):
+        """Borrow a started kernel of kernel_name with the working directory cwd"""
+        self.prestart(kernel_name)
+        queue = self.available[kernel_name]
+        try:
+            manager = queue.get(timeout=self.startup_timeout * (self.size + 1))
+        except Empty:
+            raise RuntimeError("No pooled kernel {} available".format(kernel_name)) from None
+        if isinstance(manager, Exception):
+            with self._fresh_kernel(kernel_name, cwd) as fresh:
+                yield fresh
+            return
+        try:
+            self._prepare(manager, cwd)
+            yield manager
+        finally:
+            with self.lock:
+                closed = self.closed
+            if closed:
+                self._discard(manager)
+            else:
+                self.executor.submit(self._recycle, kernel_name, manager)
+
+    def close(self):
+        """Shut down all kernels"""
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=True)
+        for manager in list(self.managers):
+            self._discard(manager)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
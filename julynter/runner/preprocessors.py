@@ -4,9 +4,19 @@ from nbconvert.preprocessors import ExecutePreprocessor, Preprocessor
 
 from ..util import vprint
 
+ORDER_ALIASES = {
+    'all': ('a', 'all', '0'),
+    'executioncount': ('e', 'ec', 'executioncount', '1'),
+    'topdown': ('t', 'topdown', 'td', '2'),
+}
+
 
 class UnsafePreprocessor(Preprocessor):
-    """Run cells following the order specified in cell_order. Define the last_try"""
+    """Run cells following the order specified in cell_order. Define the last_try
+
+    cell_callback(order, index) is called after each cell finishes successfully
+    """
+    cell_callback = None
 
     def safety_fix(self, notebook, index):
         """Fix cell code to run it safer"""
@@ -19,6 +29,8 @@ class UnsafePreprocessor(Preprocessor):
             nb.cells[index], resources = self.preprocess_cell(
                 nb.cells[index], resources, index
             )
+            if self.cell_callback is not None:
+                self.cell_callback(order, index)
         return nb, resources
 
 
@@ -86,16 +98,26 @@ class ExecutionCountPreprocessor(Preprocessor):
         return ""
 
 
+def canonical_order(order):
+    """Return the name of an execution order alias. Unknown orders are topdown"""
+    order = order.lower()
+    for name, aliases in ORDER_ALIASES.items():
+        if order in aliases:
+            return name
+    return 'topdown'
+
+
 def create_preprocessor(order, unsafe, vindex):
     """Create preprocessor class based on the execution order and safeness"""
     # pylint: disable=too-many-ancestors
-    if order.lower() in ("a", "all", "0"):
+    order = canonical_order(order)
+    if order == 'all':
         vprint(vindex, "TopDown Order - All cells")
         middle = TopBottomAllCellsPreprocessor
-    elif order.lower() in ("e", "ec", "executioncount", "1"):
+    elif order == 'executioncount':
         vprint(vindex, "ExecutionCount Order")
         middle = ExecutionCountPreprocessor
-    else: #order.lower() in ("t", "topdown", "td", "2"):
+    else:
         vprint(vindex, "TopDown Order")
         middle = TopBottomPreprocessor
     last = UnsafePreprocessor if unsafe else SafePreprocessor
@@ -4,6 +4,7 @@ import traceback
 import time
 import re
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from math import ceil
 
@@ -51,6 +52,38 @@ def clean_diff_result():
     }
 
 
+def failed_result(reason, msg):
+    """Return the result dict of a notebook that could not run"""
+    nresult = {
+        "execution": clean_result(),
+        "fail": clean_fail(),
+        "diff": clean_diff_result(),
+    }
+    nresult["execution"]["status"] = "error"
+    nresult["fail"]["reason"] = reason
+    nresult["fail"]["msg"] = msg
+    return nresult
+
+
+def result_flags(nresult, skip_comparison):
+    """Return (has_error, did_skip) of a notebook result"""
+    has_error = (
+        not nresult.get("execution", None)
+        or nresult['execution']['status'] == 'error'
+        or 'timeout' in nresult['execution']['processed']
+        or 'exception' in nresult['execution']['processed']
+        or (
+            not skip_comparison
+            and not 'finished' in nresult.get('diff', {}).get('processed', [])
+        )
+    )
+    did_skip = (not has_error and (
+        'not-run' in nresult['execution']['processed']
+        or 'skipped' in nresult['execution']['processed']
+    ))
+    return has_error, did_skip
+
+
 class Runner(object):
     """Run Jupyter notebooks"""
     # pylint: disable=useless-object-inheritance, too-many-instance-attributes
@@ -59,16 +92,18 @@ class Runner(object):
             self, path, order, unsafe,
             kernel=None, force_fail=False, notebook_timeout=300, show_report=False,
             normalizations=DEFAULT_NORMALIZATION, calculate_similarity=DEFAULT_SIMILARITY,
-            vindex=3
+            vindex=3, kernel_provider=None, incremental_compare=False
     ):
         # pylint: disable=dangerous-default-value, too-many-arguments
         self.kernel = kernel
+        self.kernel_provider = kernel_provider
         self.force_fail = force_fail
         self.notebook_timeout = notebook_timeout
         self.show_report = show_report
         self.normalizations = normalizations
         self.vindex = vindex
         self.calculate_similarity = calculate_similarity
+        self.incremental_compare = incremental_compare
         self.preprocessor = create_preprocessor(order, unsafe, vindex)
         self.path = Path(path).expanduser()
         self.notebook = None
@@ -78,6 +113,7 @@ class Runner(object):
         self.result = clean_result()
         self.fail = clean_fail()
         self.diff_result = clean_diff_result()
+        self.compared = {}
 
     def _timeout_func(self, cell):
         """Define cell timeout"""
@@ -102,7 +138,10 @@ class Runner(object):
 
     def find_kernel(self):
         """Decide which kernel to use"""
-        kernel_specs = find_kernel_specs()
+        if self.kernel_provider is not None:
+            kernel_specs = self.kernel_provider.kernel_specs()
+        else:
+            kernel_specs = find_kernel_specs()
         kernel = self.kernel
         if kernel:
             if kernel in kernel_specs:
@@ -149,18 +188,47 @@ class Runner(object):
         preprocessor.kernel_name = kernel
 
     def execute_notebook(self, preprocessor):
-        """Execute notebook"""
+        """Execute notebook. Get the kernel from the kernel provider, if it supports the kernel
+
+        Kernel providers are KernelPool and ForkServer.
+        With incremental_compare, each executed cell is compared in a background
+        thread while the kernel executes the next cell
+        """
         preprocessor.timeout_func = self._timeout_func
+        resources = {'metadata': {'path': str(self.path.parent)}}
         self.start_time = time.time()
-        preprocessor.log.propagate = False
-        preprocessor.preprocess(self.notebook, {'metadata': {'path': str(self.path.parent)}})
-        preprocessor.log.propagate = True
+        comparer = None
+        if self.incremental_compare:
+            comparer = ThreadPoolExecutor(max_workers=1)
+            preprocessor.cell_callback = (
+                lambda _, index: comparer.submit(self.compare_cell, index)
+            )
+        try:
+            provider = self.kernel_provider
+            if provider is not None and provider.supports(preprocessor.kernel_name):
+                cwd = self.path.parent.resolve()
+                with provider.kernel(preprocessor.kernel_name, cwd) as manager:
+                    # Waiting for the provided kernel does not count towards the timeout
+                    self.start_time = time.time()
+                    preprocessor.log.propagate = False
+                    preprocessor.preprocess(self.notebook, resources, km=manager)
+                    preprocessor.log.propagate = True
+                return
+            preprocessor.log.propagate = False
+            preprocessor.preprocess(self.notebook, resources)
+            preprocessor.log.propagate = True
+        finally:
+            if comparer is not None:
+                preprocessor.cell_callback = None
+                comparer.shutdown(wait=True)
 
     def run(self, clean=True):
         """Run notebook"""
         if clean:
             self.result = clean_result()
             self.fail = clean_fail()
+            self.diff_result = clean_diff_result()
+            self.compared = {}
         try:
             # pylint: disable=duplicate-except
             self.load_file()
@@ -214,30 +282,39 @@ class Runner(object):
             return False
         return True
 
+    def compare_cell(self, index):
+        """Compare cell outputs and add its similarity. Return (original_equal, any_equal)"""
+        vprint(self.vindex + 1, "Comparing cell {}".format(index))
+        old_cell = self.old_nb.cells[index]
+        new_cell = self.notebook.cells[index]
+        original_equal, any_equal, diff_result = cell_diff(
+            index, old_cell, new_cell, self.show_report,
+            self.normalizations, self.calculate_similarity,
+            self.vindex + 2
+        )
+        similarity = dict(index=index, **diff_result)
+        self.compared[index] = (original_equal, any_equal, similarity)
+        self.add_similarity(similarity)
+        return original_equal, any_equal
+
     def compare(self, clean=True):
-        """Compare notebook results"""
+        """Compare notebook results. Reuse the cells compared during the execution"""
         if clean:
             self.diff_result = clean_diff_result()
+            for _, _, similarity in self.compared.values():
+                self.add_similarity(similarity)
         vprint(self.vindex, "Comparing notebooks")
         diff = []
         new_diff = []
         for _, index in zip(range(self.result["executed_cells"]), self.result["cell_order"]):
-            vprint(self.vindex + 1, "Comparing cell {}".format(index))
-            old_cell = self.old_nb.cells[index]
-            new_cell = self.notebook.cells[index]
-            original_equal, any_equal, diff_result = cell_diff(
-                index, old_cell, new_cell, self.show_report,
-                self.normalizations, self.calculate_similarity,
-                self.vindex + 2
-            )
+            if index in self.compared:
+                original_equal, any_equal, _ = self.compared[index]
+            else:
+                original_equal, any_equal = self.compare_cell(index)
             if not original_equal:
                 diff.append(index)
             if not any_equal:
                 new_diff.append(index)
-            self.add_similarity(dict(
-                index=index,
-                **diff_result
-            ))
 
         if not diff:
             vprint(self.vindex + 1, "Identical results")
@@ -0,0 +1,84 @@
+"""Persistent store of notebook run results"""
+import hashlib
+import json
+import time
+
+from ..sqlitestore import SQLiteStore
+from ..util import Path
+from .preprocessors import canonical_order
+
+
+def _json_default(value):
+    """Encode bytes results of julynter env"""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+class ResultStore(SQLiteStore):
+    """SQLite store of julynter run results
+
+    Results are keyed by notebook path, notebook content hash, cell order,
+    normalizations and environment, so changed notebooks and different run
+    configurations are executed again.
+    The store is disabled after the first database error
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS results ('
+        'path TEXT, digest TEXT, cell_order TEXT, normalizations TEXT, '
+        'environment TEXT, failed INTEGER, result TEXT, updated REAL, '
+        'PRIMARY KEY (path, digest, cell_order, normalizations, environment))',
+    )
+
+    def __init__(self, path, cell_order, normalizations, environment, timeout=5.0):
+        # pylint: disable=too-many-arguments
+        super(ResultStore, self).__init__(path, timeout)
+        self.cell_order = canonical_order(cell_order)
+        self.normalizations = json.dumps(list(normalizations or []))
+        self.environment = environment
+
+    def key(self, notebook):
+        """Return the key of notebook or None if it cannot be read"""
+        path = Path(notebook).expanduser()
+        try:
+            with open(str(path), 'rb') as fil:
+                digest = hashlib.sha256(fil.read()).hexdigest()
+        except OSError:
+            return None
+        return (
+            str(path.resolve()), digest, self.cell_order,
+            self.normalizations, self.environment
+        )
+
+    def get(self, key):
+        """Return (failed, result) stored for key or None"""
+        if key is None:
+            return None
+        row = self._fetchone(
+            'SELECT failed, result FROM results WHERE path = ? AND digest = ? '
+            'AND cell_order = ? AND normalizations = ? AND environment = ?', key
+        )
+        if row is None:
+            return None
+        try:
+            return (bool(row[0]), json.loads(row[1]))
+        except (ValueError, TypeError):
+            return None
+
+    def completed(self, key, retry_failures=False):
+        """Return the stored result of key if it does not need to run again, or None"""
+        stored = self.get(key)
+        if stored is None or (retry_failures and stored[0]):
+            return None
+        return stored[1]
+
+    def put(self, key, failed, result):
+        """Store the result of key"""
+        if key is None:
+            return
+        self._write(
+            'INSERT OR REPLACE INTO results (path, digest, cell_order, '
+            'normalizations, environment, failed, result, updated) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [key + (int(failed), json.dumps(result, default=_json_default), time.time())]
+        )
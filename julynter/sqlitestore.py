@@ -0,0 +1,69 @@
+"""Base of the SQLite stores of julynter"""
+import sqlite3
+from pathlib import Path
+
+
+class SQLiteStore(object):
+    """SQLite database opened on first use with the SCHEMA statements
+
+    The store is disabled after the first database error, so julynter
+    keeps working with read-only or locked directories.
+    It uses the default rollback journal, since the WAL journal does not work
+    on network filesystems, such as home directories shared by many hosts.
+    Set wal only for databases on local disks
+    """
+    # pylint: disable=useless-object-inheritance
+    SCHEMA = ()
+
+    def __init__(self, path, timeout=5.0, wal=False):
+        self.path = Path(path).expanduser() if path else None
+        self.timeout = timeout
+        self.wal = wal
+        self.connection = None
+
+    def _connect(self):
+        """Open the database on first use"""
+        if self.connection is None and self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(
+                    str(self.path), timeout=self.timeout, check_same_thread=False
+                )
+                if self.wal:
+                    connection.execute('PRAGMA journal_mode=WAL')
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+                self.connection = connection
+            except (OSError, sqlite3.Error):
+                self.path = None
+        return self.connection
+
+    def _fetchone(self, query, params):
+        """Return the first row of query or None"""
+        connection = self._connect()
+        if connection is None:
+            return None
+        try:
+            return connection.execute(query, params).fetchone()
+        except sqlite3.Error:
+            self.close()
+            return None
+
+    def _write(self, statement, rows):
+        """Execute statement for each row in a single transaction"""
+        connection = self._connect()
+        if connection is None or not rows:
+            return
+        try:
+            with connection:
+                connection.executemany(statement, rows)
+        except sqlite3.Error:
+            self.close()
+
+    def close(self):
+        """Close and disable the store"""
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = None
+        self.path = None
@@ -62,6 +62,7 @@ setup_args = dict(
         'timeout-decorator',
         'jupyter',
         'nbformat',
+        'importlib_metadata;python_version<"3.8"',
         'pathlib2;python_version<="3.4"',
         'pathlib2;python_version=="2.7"',
     ],
@@ -44,6 +44,7 @@ export const ReportIds = [
   'h6',
   'i1',
   'i2',
+  'i3',
   'p1',
   't1',
   't2',
@@ -72,6 +73,28 @@ export interface IQueryResult {
       };
     };
   };
+  import_times?: {
+    [cell: number]: {
+      [module: string]: {
+        cumulative: number;
+        self: number;
+      };
+    };
+  };
+  execution_costs?: {
+    [cell: number]: {
+      wall: number;
+      cpu: number;
+      rss?: number;
+    };
+  };
+  version?: number;
+  epoch?: string;
+  full?: boolean;
+  removed?: { [field: string]: (string | number)[] };
+  requestId?: number;
+  push?: boolean;
+  since?: number;
 }
 
 /**
@@ -192,6 +215,7 @@ export interface IJulynterLintOptions {
   view: boolean;
   restart: boolean;
   requirements: string;
+  importBudget: number;
   types: { [id in ErrorTypeKey]: boolean };
   reports: { [id in ReportId]: boolean };
   kernel: {
@@ -210,6 +234,7 @@ export interface ILintOptionsManager {
   checkView(): boolean;
   checkRestart(): boolean;
   checkRequirements(): string;
+  checkImportBudget(): number;
   checkFiltered(): string[];
   updateReport(key: ReportId, value: boolean): void;
   updateType(key: ErrorTypeKey, value: boolean): void;
@@ -217,6 +242,7 @@ export interface ILintOptionsManager {
   updateView(view: boolean): void;
   updateRestart(view: boolean): void;
   updateRequirements(req: string): void;
+  updateImportBudget(budget: number): void;
   resetFiltered(): void;
   addLintFilter(hash: string): void;
   initializeOptions(checks: IJulynterLintOptions, filtered: string[]): void;
@@ -103,6 +103,8 @@ export class Linter {
     const cellDependencies = this.update.cell_dependencies || {};
     const missingDependencies = this.update.missing_dependencies || {};
     const missingRequirements = this.update.missing_requirements || {};
+    const importTimes = this.update.import_times || {};
+    const importBudget = this.options.checkImportBudget();
 
     let lastExecutionCount = -1;
     let firstCodeCell = -1;
@@ -222,6 +224,24 @@ export class Linter {
             itemGenerator.create(index, cell.model.type, 'i1', text, [index])
           );
         }
+        if ({}.hasOwnProperty.call(importTimes, currentCount)) {
+          const times = importTimes[currentCount];
+          const modules = Object.keys(times);
+          const total = modules.reduce(
+            (sum, module) => sum + times[module].self,
+            0
+          );
+          if (total > importBudget) {
+            modules.sort((a, b) => times[b].cumulative - times[a].cumulative);
+            headings.push(
+              itemGenerator.create(index, cell.model.type, 'i3', text, [
+                index,
+                total.toFixed(0),
+                modules.join(', '),
+              ])
+            );
+          }
+        }
         if ({}.hasOwnProperty.call(absolutePaths, currentCount)) {
           headings.push(
             itemGenerator.create(index, cell.model.type, 'p1', text, [
@@ -46,6 +46,10 @@ export abstract class AbstractOptionsManager implements ILintOptionsManager {
     return this.checks.requirements;
   }
 
+  checkImportBudget(): number {
+    return this.checks.importBudget;
+  }
+
   checkFiltered(): string[] {
     return this.filteredHashes;
   }
@@ -80,6 +84,11 @@ export abstract class AbstractOptionsManager implements ILintOptionsManager {
     this.saveKey('requirements', req, true);
   }
 
+  updateImportBudget(budget: number): void {
+    this.checks.importBudget = budget;
+    this.saveKey('import-budget', budget, true);
+  }
+
   resetFiltered(): void {
     this.filteredHashes = [];
     this.saveKey('filtered-hashes', this.filteredHashes, true);
@@ -106,6 +115,10 @@ export abstract class AbstractOptionsManager implements ILintOptionsManager {
         view: this.loadKey('view', this.default.view),
         restart: this.loadKey('restart', this.default.restart),
         requirements: this.loadKey('requirements', this.default.requirements),
+        importBudget: this.loadKey(
+          'import-budget',
+          this.default.importBudget
+        ),
         reports: ReportIds.reduce(
           (previous, key) => {
             const rkey = 'report-' + key;
@@ -133,6 +146,7 @@ export abstract class AbstractOptionsManager implements ILintOptionsManager {
     this.saveKey('view', this.checks.view, false);
     this.saveKey('restart', this.checks.restart, false);
     this.saveKey('requirements', this.checks.requirements, false);
+    this.saveKey('import-budget', this.checks.importBudget, false);
     for (const key of ErrorTypeKeys) {
       this.saveKey('type-' + key, this.checks.types[key], false);
     }
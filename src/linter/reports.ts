@@ -241,6 +241,17 @@ export const ERRORS: { [id in ReportId]: IErrorMessage } = {
     reason:
       'Using a requirements file with pinned versions for all imported modules increases the reproducibility of the notebook.',
   },
+  i3: {
+    label: (i: number, time: string, modules: string): string =>
+      `Cell ${i} spent ${time} ms importing ${modules}`,
+    suggestion:
+      'Please consider removing unused heavy imports or importing them lazily.',
+    type: 'import',
+    action: goToCell,
+    restart: false,
+    reason:
+      'Slow imports increase the time of restarting the kernel and running all cells, making it harder to check the reproducibility of the notebook.',
+  },
   // Path
   p1: {
     label: (i: number, paths: string): string =>
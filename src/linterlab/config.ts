@@ -36,6 +36,7 @@ export class Config {
       view: true,
       restart: true,
       requirements: 'requirements.txt',
+      importBudget: 1000,
       types: {
         invalidtitle: true,
         hiddenstate: true,
@@ -57,6 +58,7 @@ export class Config {
         h6: true,
         i1: true,
         i2: true,
+        i3: true,
         p1: true,
         t1: true,
         t2: true,
@@ -212,6 +214,9 @@ export class Config {
       if (newOptions.requirements !== undefined) {
         original.requirements = newOptions.requirements;
       }
+      if (newOptions.importBudget !== undefined) {
+        original.importBudget = newOptions.importBudget;
+      }
       if (newOptions.types !== undefined) {
         for (const key of ErrorTypeKeys) {
           const value = newOptions.types[key];
@@ -49,6 +49,9 @@ export class NotebookHandler implements IDisposable {
   private _eh: ErrorHandler;
   private _reportedStart: boolean;
   private _icomm: IComm;
+  private _queryState: IQueryResult;
+  private _queryRequestId: number;
+  private _pushEnabled: boolean;
 
   public options: OptionsManager;
   public update: IQueryResult | null;
@@ -84,6 +87,9 @@ export class NotebookHandler implements IDisposable {
       this.hasKernel = false;
       this._reportedStart = false;
       this._icomm = null;
+      this._queryState = {};
+      this._queryRequestId = 0;
+      this._pushEnabled = false;
       this._boundQueryCall = this._queryCall.bind(this);
 
       em.reportActivity(this, 'open');
@@ -196,6 +202,8 @@ export class NotebookHandler implements IDisposable {
 
       this._kernelRestarted.connect(
         (sender: any, kernelReady: Promise<void>) => {
+          this._queryState = {};
+          this._pushEnabled = false;
           this._inspected.emit({
             status: 'Restarting Kernel...',
           } as IJulynterKernelUpdate);
@@ -408,6 +416,10 @@ export class NotebookHandler implements IDisposable {
     this.send({
       operation: 'query',
       requirements: this.options.checkRequirements(),
+      requestId: ++this._queryRequestId,
+      version: this._queryState.version ?? null,
+      epoch: this._queryState.epoch ?? null,
+      push: true,
     });
   }
 
@@ -419,6 +431,9 @@ export class NotebookHandler implements IDisposable {
       operation: 'addModule',
       module: module,
       requirements: this.options.checkRequirements(),
+      requestId: ++this._queryRequestId,
+      version: this._queryState.version ?? null,
+      epoch: this._queryState.epoch ?? null,
     });
   }
 
@@ -432,6 +447,44 @@ export class NotebookHandler implements IDisposable {
     });
   }
 
+  /*
+   * Merge a versioned query result into the known query state
+   */
+  private _mergeQueryResult(result: IQueryResult): IQueryResult {
+    if (result.full !== false) {
+      this._queryState = result;
+      return this._queryState;
+    }
+    const state: { [field: string]: any } = this._queryState;
+    const delta: { [field: string]: any } = result;
+    const removedKeys = result.removed || {};
+    for (const field of [
+      'executed_code',
+      'cell_dependencies',
+      'missing_dependencies',
+      'absolute_paths',
+      'missing_requirements',
+      'import_times',
+      'execution_costs',
+    ]) {
+      const removed = (removedKeys[field] || []).map(String);
+      const merged: { [key: string]: any } = {};
+      for (const key of Object.keys(state[field] || {})) {
+        if (!removed.includes(key)) {
+          merged[key] = state[field][key];
+        }
+      }
+      state[field] = Object.assign(merged, delta[field] || {});
+    }
+    const removedImports = (removedKeys.has_imports || []).map(Number);
+    state.has_imports = (state.has_imports || [])
+      .filter((lineno: number) => !removedImports.includes(lineno))
+      .concat(result.has_imports || []);
+    this._queryState.version = result.version;
+    this._queryState.epoch = result.epoch;
+    return this._queryState;
+  }
+
   /*
    * Handle query response
    */
@@ -440,11 +493,40 @@ export class NotebookHandler implements IDisposable {
   ): void | PromiseLike<void> {
     try {
       const operation = msg.content.data.operation;
+      const requestId = msg.content.data.requestId as number | undefined;
+      if (
+        operation === 'queryResult' &&
+        requestId !== undefined &&
+        requestId < this._queryRequestId
+      ) {
+        // Superseded by a newer query
+        return;
+      }
       if (operation === 'queryResult') {
+        const result = msg.content.data as IQueryResult;
+        if (result.push !== undefined) {
+          this._pushEnabled = result.push;
+        }
+        this._inspected.emit({
+          status: '',
+          kernelName: this._session.kernelDisplayName || '',
+          result: this._mergeQueryResult(result),
+        });
+      } else if (operation === 'update') {
+        const update = msg.content.data as IQueryResult;
+        if (
+          update.full === false &&
+          (update.epoch !== this._queryState.epoch ||
+            (this._queryState.version ?? -1) < update.since)
+        ) {
+          // Missed an update. Request the changes since the known version
+          this.performQuery();
+          return;
+        }
         this._inspected.emit({
           status: '',
           kernelName: this._session.kernelDisplayName || '',
-          result: msg.content.data as IQueryResult,
+          result: this._mergeQueryResult(update),
         });
       } else if (operation === 'error') {
         this._eh.report(
@@ -474,7 +556,10 @@ export class NotebookHandler implements IDisposable {
       const msgType = msg.header.msg_type;
       switch (msgType) {
         case 'execute_input':
-          this.performQuery();
+          if (!this._pushEnabled) {
+            // In push mode, the kernel sends updates after each execution
+            this.performQuery();
+          }
           break;
         default:
           break;